@@ -45,6 +45,7 @@ def build_console_exe_only():
         "--icon=excel.jpg",             # 图标文件
         "--add-data=excel_merger.py;.", # 包含合并模块
         "--add-data=excel_processor.py;.", # 包含处理模块
+        "--add-data=excel_utils.py;.",  # 包含公共函数模块
         "--distpath=dist",              # 输出目录
         "--workpath=build",             # 工作目录
         "--specpath=.",                 # spec文件位置
@@ -116,7 +117,7 @@ def main():
         return False
     
     # 检查依赖模块
-    required_files = ["excel_merger.py", "excel_processor.py"]
+    required_files = ["excel_merger.py", "excel_processor.py", "excel_utils.py"]
     for file in required_files:
         if not os.path.exists(file):
             print(f"❌ 找不到依赖模块: {file}")
@@ -78,6 +78,7 @@ class ExcelToolDeployer:
             "--icon=excel.jpg",
             "--add-data=excel_merger.py;.",
             "--add-data=excel_processor.py;.",
+            "--add-data=excel_utils.py;.",
             "--distpath=dist",
             "--workpath=build",
             "--clean",
@@ -102,6 +103,7 @@ class ExcelToolDeployer:
             f"--name={self.project_name}_console",
             "--add-data=excel_merger.py;.",
             "--add-data=excel_processor.py;.",
+            "--add-data=excel_utils.py;.",
             "--distpath=dist",
             "--workpath=build",
             "--clean",
@@ -1,254 +1,168 @@
 import pandas as pd
+import numpy as np
 import os
 import glob
 import re
-from typing import List, Tuple, Dict, Optional
-from difflib import SequenceMatcher
+import shutil
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Optional, Callable
+from functools import lru_cache
+from operator import itemgetter
+
+from excel_utils import io_worker_count, calculate_similarity
+
+try:
+    import python_calamine  # noqa: F401  Rust 实现的 Excel 读取引擎，比 openpyxl 快数倍
+    _EXCEL_ENGINE = 'calamine'
+except ImportError:  # 未安装时使用 pandas 默认引擎
+    _EXCEL_ENGINE = None
+
+try:
+    import xlsxwriter  # noqa: F401  写入速度和内存占用都优于 openpyxl
+    _EXCEL_WRITER_ENGINE = 'xlsxwriter'
+    # 关闭字符串自动转超链接：数据中的路径、网址按普通文本导出，也避免超过工作表超链接数量上限
+    _EXCEL_WRITER_KWARGS = {'options': {'strings_to_urls': False}}
+except ImportError:
+    _EXCEL_WRITER_ENGINE = 'openpyxl'
+    _EXCEL_WRITER_KWARGS = {}
+
+# 列名清理使用的正则表达式（模块加载时编译一次）
+_WS_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\u4e00-\u9fff]')
+
+# 字段分析时需要跳过的说明性字段
+_NOTE_FIELDS = frozenset({'说明', '说明文字', '备注', '注释'})
+_NOTE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, ['说明', '备注', '注释', '注意', '提示'])))
+
+# 交互输入的编号校验
+_INT_RE = re.compile(r'^\s*(\d+)\s*$')
+
+@lru_cache(maxsize=4096)
+def _clean_column_name_cached(column_name: str) -> str:
+    """
+    清理列名的实际实现（按列名缓存结果，同一列名在多个文件、多次匹配中只清理一次）
+    
+    Args:
+        column_name: 原始列名
+        
+    Returns:
+        清理后的列名
+    """
+    # 合并连续空白，再去除特殊字符（保留中文、英文、数字、下划线），最后统一去除首尾空格
+    # 首尾空白在合并后只剩单个空格，由最后的 strip() 一并去掉，无需预先 strip
+    cleaned = _SPECIAL_CHARS_RE.sub('', _WS_RE.sub(' ', column_name))
+    
+    return cleaned.strip()
+
+@lru_cache(maxsize=256)
+def _compile_wildcard(pattern: str, flexible: bool):
+    """
+    将通配符模式编译为正则表达式（按模式缓存，同一模式只编译一次）
+    
+    Args:
+        pattern: 包含 * 的模式字符串
+        flexible: True 时 * 代表任意字符序列，False 时 * 代表任意一个字符
+        
+    Returns:
+        编译后的正则表达式（锚定到文本开头和末尾，要求整体匹配）
+    """
+    # * 以外的字符按字面量匹配，字段名中的 . ( ) 等不会被当作正则语法
+    wildcard = '.*' if flexible else '.'
+    return re.compile('^' + wildcard.join(map(re.escape, pattern.split('*'))) + r'\Z', re.DOTALL)
+
+# 将字段列表拼接成一个字符串进行批量匹配时使用的分隔符（Excel列名中不会出现）
+_FIELD_SEPARATOR = '\x1f'
+
+@lru_cache(maxsize=256)
+def _compile_wildcard_blob(pattern: str):
+    """
+    将通配符模式编译为在“分隔符拼接的字段字符串”上整体扫描的正则表达式
+    
+    * 只匹配分隔符以外的字符，其余字符按字面量匹配，保证每个匹配都恰好是一个完整字段
+    
+    Args:
+        pattern: 包含 * 的模式字符串
+        
+    Returns:
+        编译后的正则表达式，第1个分组为匹配到的字段
+    """
+    body = f'[^{_FIELD_SEPARATOR}]*'.join(map(re.escape, pattern.split('*')))
+    return re.compile(f'(?:\\A|{_FIELD_SEPARATOR})({body})(?={_FIELD_SEPARATOR}|\\Z)')
+
+def auto_accept_best(required_field: str, candidates: List[Tuple[str, float]]) -> Optional[str]:
+    """
+    非交互式列名映射策略：自动接受相似度最高的候选列名
+    
+    Args:
+        required_field: 标准字段名
+        candidates: 按相似度从高到低排列的候选列名（均已达到相似度阈值）
+        
+    Returns:
+        选中的列名，没有候选时返回 None（跳过此字段）
+    """
+    return candidates[0][0] if candidates else None
+
+def skip_all(required_field: str, candidates: List[Tuple[str, float]]) -> Optional[str]:
+    """
+    非交互式列名映射策略：跳过所有需要确认的映射
+    
+    Args:
+        required_field: 标准字段名
+        candidates: 按相似度从高到低排列的候选列名
+        
+    Returns:
+        始终返回 None
+    """
+    return None
 
 class ExcelProcessor:
     """Excel文件处理工具"""
     
+    # 常见列名变体映射（只读数据，所有实例共享）
+    # 使用不可变的元组保存，元组中的顺序即变体匹配时的优先顺序
+    common_column_variants = {
+        '学号': ('学号', '学号号', '学学号', 'xuehao', 'student_id', '学生编号', '学生学号'),
+        '学生姓名': ('学生姓名', '学生姓名名', '学学生姓名', 'student_name', '姓名', '学生名', '学生姓名（中文）'),
+        '班级': ('班级', '班', 'class', '班级名称', 'class_name'),
+        '成绩': ('成绩', '分数', 'score', 'grade', '考试分数'),
+        '课程': ('课程', '科目', 'course', 'subject', '课程名称')
+    }
+    # 变体 -> 标准字段名 的反向索引，用于 O(1) 判断两个列名是否属于同一组变体
+    _variant_to_standard = {
+        variant: standard_name
+        for standard_name, variants in common_column_variants.items()
+        for variant in variants
+    }
+    
     def __init__(self):
         self.selected_files = []
         self.all_fields = []
+        self.field_occurrence = {}  # 字段 -> 出现该字段的文件数（由 get_field_list 计算）
         self.selected_fields = []
         self.deduplicate = False
         self.dedup_fields = []
         self.output_filename = "result.xlsx"
+        self._header_cache = {}  # (文件路径, 修改时间, 文件大小) -> 表头列名（文件未改动时只读取一次）
+        self._verify_source_cache = {}  # 文件路径 -> (源文件数据框, 已归一化的列)，仅在显示重复组期间使用
+        self._backup_dir = None  # 本次运行使用的备份目录（多次备份时复用）
         
         # 重复记录相关属性
         self.duplicate_records = pd.DataFrame()  # 存储发现的重复记录
         self.duplicate_count = 0  # 重复记录数量
+        self.removed_count = 0  # 去重时实际删除的记录数量
         self.enable_interactive_dedup = True  # 是否启用交互式去重
         self.conflict_resolution_choices = {}  # 存储用户的冲突解决选择
 
         
         # 新增：智能列名匹配相关属性
         self.column_mapping = {}  # 列名映射关系
+        self._column_mapping_cache = {}  # (需要的列名, 可用的列名) -> 映射结果，表头完全相同的文件直接复用
         self.enable_smart_matching = True  # 是否启用智能匹配
         self.similarity_threshold = 0.8  # 相似度阈值
         self.auto_clean_columns = True  # 是否自动清理列名
-        
-        # 常见列名变体映射（去重）
-        self.common_column_variants = {
-            '学号': ['学号', '学号号', '学学号', 'xuehao', 'student_id', '学生编号', '学生学号'],
-            '学生姓名': ['学生姓名', '学生姓名名', '学学生姓名', 'student_name', '姓名', '学生名', '学生姓名（中文）'],
-            '班级': ['班级', '班', 'class', '班级名称', 'class_name'],
-            '成绩': ['成绩', '分数', 'score', 'grade', '考试分数'],
-            '课程': ['课程', '科目', 'course', 'subject', '课程名称']
-        }
-    
-    def clean_column_name(self, column_name: str) -> str:
-        """
-        清理列名，去除空格、特殊字符等
-        
-        Args:
-            column_name: 原始列名
-            
-        Returns:
-            清理后的列名
-        """
-        if not self.auto_clean_columns:
-            return column_name
-        
-        # 去除首尾空格
-        cleaned = column_name.strip()
-        
-        # 去除多余的空格
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        
-        # 去除特殊字符（保留中文、英文、数字、下划线）
-        cleaned = re.sub(r'[^\w\s\u4e00-\u9fff]', '', cleaned)
-        
-        # 再次去除空格
-        cleaned = cleaned.strip()
-        
-        return cleaned
-    
-    def calculate_similarity(self, str1: str, str2: str) -> float:
-        """
-        计算两个字符串的相似度
-        
-        Args:
-            str1: 字符串1
-            str2: 字符串2
-            
-        Returns:
-            相似度 (0-1)
-        """
-        # 使用SequenceMatcher计算相似度
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
-    
-    def find_similar_columns(self, target_column: str, available_columns: List[str]) -> List[Tuple[str, float]]:
-        """
-        查找与目标列名相似的列名
-        
-        Args:
-            target_column: 目标列名
-            available_columns: 可用列名列表
-            
-        Returns:
-            相似列名列表，包含相似度
-        """
-        similar_columns = []
-        cleaned_target = self.clean_column_name(target_column)
-        
-        for column in available_columns:
-            cleaned_column = self.clean_column_name(column)
-            
-            # 精确匹配
-            if cleaned_target == cleaned_column:
-                similar_columns.append((column, 1.0))
-                continue
-            
-            # 计算相似度
-            similarity = self.calculate_similarity(cleaned_target, cleaned_column)
-            
-            # 检查是否是常见变体
-            for standard_name, variants in self.common_column_variants.items():
-                if cleaned_target in variants and cleaned_column in variants:
-                    similarity = max(similarity, 0.9)  # 提高变体的相似度
-                    break
-            
-            if similarity >= self.similarity_threshold:
-                similar_columns.append((column, similarity))
-        
-        # 按相似度排序
-        similar_columns.sort(key=lambda x: x[1], reverse=True)
-        return similar_columns
-    
-    def smart_column_mapping(self, required_columns: List[str], available_columns: List[str]) -> Dict[str, str]:
-        """
-        智能列名映射
-        
-        Args:
-            required_columns: 需要的列名
-            available_columns: 可用的列名
-            
-        Returns:
-            列名映射字典
-        """
-        mapping = {}
-        unmapped_required = []
-        unmapped_available = available_columns.copy()
-        
-
-        
-        # 第一轮：精确匹配和常见变体匹配
-        for required in required_columns:
-            matched = False
-            
-            # 检查精确匹配
-            if required in available_columns:
-                mapping[required] = required
-                unmapped_available.remove(required)
-
-                matched = True
-                continue
-            
-            # 检查常见变体
-            if required in self.common_column_variants:
-                variants = self.common_column_variants[required]
-                for variant in variants:
-                    if variant in available_columns:
-                        mapping[required] = variant
-                        unmapped_available.remove(variant)
-                        print(f"✅ 变体匹配: {variant} -> {required}")
-                        matched = True
-                        break
-            
-            if not matched:
-                unmapped_required.append(required)
-        
-        # 第二轮：模糊匹配
-        if unmapped_required and unmapped_available:
-            print(f"\n🔍 进行模糊匹配...")
-            for required in unmapped_required:
-                similar_columns = self.find_similar_columns(required, unmapped_available)
-                
-                if similar_columns:
-                    best_match, similarity = similar_columns[0]
-                    print(f"🔍 找到相似列名: {best_match} -> {required} (相似度: {similarity:.2f})")
-                    
-                    # 如果相似度为1.00，自动确认映射
-                    if similarity >= 1.0:
-                        mapping[required] = best_match
-                        unmapped_available.remove(best_match)
-                        print(f"✅ 自动映射 (完全匹配): {best_match} -> {required}")
-                    else:
-                        # 询问用户是否确认映射
-                        confirm = input(f"是否将文件列名 '{best_match}' 映射到标准字段 '{required}'？(y/n，默认y): ").strip().lower()
-                        if confirm not in ['n', 'no', '否']:
-                            mapping[required] = best_match
-                            unmapped_available.remove(best_match)
-                            print(f"✅ 确认映射: {best_match} -> {required}")
-                        else:
-                            print(f"⚠️  跳过映射: {required}")
-                else:
-                    print(f"❌ 未找到与 '{required}' 相似的列名")
-                    print(f"🤔 请选择:")
-                    print(f"  1. 手动选择列名 (输入 'm')")
-                    print(f"  2. 跳过此字段 (输入 's')")
-                    
-                    while True:
-                        choice = input(f"对于字段 '{required}' 请选择: ").strip().lower()
-                        if choice == 's':
-                            print(f"⚠️  跳过映射: {required}")
-                            break
-                        elif choice == 'm':
-                            selected_column = self._manual_select_column(required, unmapped_available)
-                            if selected_column:
-                                mapping[required] = selected_column
-                                unmapped_available.remove(selected_column)
-                                unmapped_required.remove(required)
-                                print(f"✅ 手动映射: {selected_column} -> {required}")
-                            break
-                        else:
-                            print("❌ 请输入 'm' 或 's'")
-        
-        # 显示映射结果
-        if mapping:
-            print(f"\n📋 列名映射结果:")
-            for required, mapped in mapping.items():
-                print(f"  {mapped} -> {required}")
-        
-        if unmapped_required:
-            print(f"\n⚠️  未映射的列名: {unmapped_required}")
-        
-        return mapping
-    
-    def validate_required_columns(self, df: pd.DataFrame, required_columns: List[str]) -> Tuple[bool, List[str], Dict[str, str]]:
-        """
-        验证必需的列名是否存在，支持智能匹配
-        
-        Args:
-            df: 数据框
-            required_columns: 必需的列名列表
-            
-        Returns:
-            (是否验证通过, 缺失的列名列表, 列名映射字典)
-        """
-        available_columns = list(df.columns)
-        missing_columns = []
-        column_mapping = {}
-        
-        if not self.enable_smart_matching:
-            # 传统严格匹配
-            for required in required_columns:
-                if required not in available_columns:
-                    missing_columns.append(required)
-                else:
-                    column_mapping[required] = required
-        else:
-            # 智能匹配
-            column_mapping = self.smart_column_mapping(required_columns, available_columns)
-            
-            # 检查哪些列名没有被映射
-            for required in required_columns:
-                if required not in column_mapping:
-                    missing_columns.append(required)
-        
-        return len(missing_columns) == 0, missing_columns, column_mapping
+        # 非交互式列名映射策略，如 auto_accept_best / skip_all；为 None 时通过 input() 询问用户
+        self.resolution_policy: Optional[Callable[[str, List[Tuple[str, float]]], Optional[str]]] = None
     
     def select_files(self, folder_path: str = ".") -> List[str]:
         """
@@ -326,31 +240,25 @@ class ExcelProcessor:
             所有字段的列表
         """
         print(f"\n=== 步骤2: 字段分析 ===")
-        all_fields = set()
         file_field_info = {}
         
+        # 先并发读取所有文件的表头，下面按文件顺序处理时直接使用缓存
+        self._prefetch_headers(files)
+        
         for file in files:
             try:
-                df = pd.read_excel(file)
-                file_fields = list(df.columns)
+                file_fields = self._read_headers(file)
                 
                 # 过滤掉无效字段（说明文字、Unnamed字段等）
                 valid_fields = []
                 for field in file_fields:
-                    # 跳过Unnamed字段
-                    if field.startswith('Unnamed:'):
-                        continue
-                    # 跳过说明文字（通常包含很长的描述性文字）
-                    if len(field) > 100:
-                        continue
-                    # 跳过空字段
-                    if not field or field.strip() == '':
-                        continue
-                    # 跳过纯说明性字段
-                    if field in ['说明', '说明文字', '备注', '注释']:
-                        continue
-                    # 跳过包含说明关键词的字段
-                    if any(keyword in field for keyword in ['说明', '备注', '注释', '注意', '提示']):
+                    # 跳过Unnamed字段、说明文字（通常包含很长的描述性文字）、空字段、
+                    # 纯说明性字段以及包含说明关键词的字段
+                    if (field.startswith('Unnamed:')
+                            or len(field) > 100
+                            or not field.strip()
+                            or field in _NOTE_FIELDS
+                            or _NOTE_KEYWORDS_RE.search(field)):
                         continue
                     
                     # 如果启用自动清理，显示清理后的列名
@@ -362,7 +270,6 @@ class ExcelProcessor:
                     else:
                         valid_fields.append(field)
                 
-                all_fields.update(valid_fields)
                 file_field_info[os.path.basename(file)] = {
                     'field_count': len(valid_fields),
                     'fields': valid_fields
@@ -373,13 +280,15 @@ class ExcelProcessor:
                 print(f"❌ 读取文件 '{os.path.basename(file)}' 时出错: {str(e)}")
         
         # 计算每个字段的出现次数并排序
+        # 直接按文件累加（倒排计数），每个文件内同名字段只计一次
         field_occurrence = {}
-        for field in all_fields:
-            files_with_field = [f for f, info in file_field_info.items() if field in info['fields']]
-            field_occurrence[field] = len(files_with_field)
+        for info in file_field_info.values():
+            for field in dict.fromkeys(info['fields']):
+                field_occurrence[field] = field_occurrence.get(field, 0) + 1
         
         # 按出现次数从高到低排序
         sorted_fields = sorted(field_occurrence.items(), key=lambda x: x[1], reverse=True)
+        self.field_occurrence = field_occurrence
         self.all_fields = [field for field, count in sorted_fields]
         
         print(f"\n✅ 总共发现 {len(self.all_fields)} 个不同有效字段")
@@ -394,6 +303,65 @@ class ExcelProcessor:
     
 
     
+    def _read_headers(self, file_path: str) -> List[str]:
+        """
+        只读取Excel文件的表头行（nrows=0），结果按文件路径、修改时间和大小缓存
+        
+        文件在运行期间被修改（如用户在Excel中调整了表头）时，缓存自动失效并重新读取
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            原始列名列表
+        """
+        stat = os.stat(file_path)
+        cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+        if cache_key not in self._header_cache:
+            self._header_cache[cache_key] = list(pd.read_excel(file_path, nrows=0, engine=_EXCEL_ENGINE).columns)
+        return list(self._header_cache[cache_key])
+    
+    def _prefetch_headers(self, files: List[str]):
+        """
+        使用线程池并发读取多个文件的表头并写入缓存
+        
+        读取失败的文件不会写入缓存，之后按顺序处理时会再次读取并输出错误信息
+        
+        Args:
+            files: 文件列表
+        """
+        # 已缓存的文件在 _read_headers 中直接命中缓存
+        pending = list(dict.fromkeys(files))
+        if len(pending) < 2:
+            return
+        
+        def read_quietly(file_path):
+            try:
+                self._read_headers(file_path)
+            except Exception:
+                pass
+        
+        with ThreadPoolExecutor(max_workers=io_worker_count(len(pending))) as executor:
+            list(executor.map(read_quietly, pending))
+    
+    def _read_selected_columns(self, file_path: str, headers: List[str], usecols: List[int]) -> pd.DataFrame:
+        """
+        只读取Excel文件中指定位置的列
+        
+        Args:
+            file_path: 文件路径
+            headers: 文件表头（列名沿用其中的名称）
+            usecols: 需要读取的列位置，为空时读取全部列
+            
+        Returns:
+            数据框
+        """
+        if usecols:
+            df = pd.read_excel(file_path, usecols=usecols, engine=_EXCEL_ENGINE)
+            df.columns = [headers[position] for position in usecols]
+            return df
+        return pd.read_excel(file_path, engine=_EXCEL_ENGINE)
+    
     def get_file_fields(self, file_path: str) -> List[str]:
         """
         获取单个文件的字段列表
@@ -405,20 +373,13 @@ class ExcelProcessor:
             字段列表
         """
         try:
-            df = pd.read_excel(file_path)
-            file_fields = list(df.columns)
+            file_fields = self._read_headers(file_path)
             
             # 过滤掉无效字段（说明文字、Unnamed字段等）
             valid_fields = []
             for field in file_fields:
-                # 跳过Unnamed字段
-                if field.startswith('Unnamed:'):
-                    continue
-                # 跳过说明文字（通常包含很长的描述性文字）
-                if len(field) > 100:
-                    continue
-                # 跳过空字段
-                if not field or field.strip() == '':
+                # 跳过Unnamed字段、说明文字（通常包含很长的描述性文字）和空字段
+                if field.startswith('Unnamed:') or len(field) > 100 or not field.strip():
                     continue
                 valid_fields.append(field)
             
@@ -439,19 +400,7 @@ class ExcelProcessor:
         if not self.auto_clean_columns:
             return column_name
         
-        # 去除首尾空格
-        cleaned = column_name.strip()
-        
-        # 去除多余的空格
-        cleaned = re.sub(r'\s+', ' ', cleaned)
-        
-        # 去除特殊字符（保留中文、英文、数字、下划线）
-        cleaned = re.sub(r'[^\w\s\u4e00-\u9fff]', '', cleaned)
-        
-        # 再次去除空格
-        cleaned = cleaned.strip()
-        
-        return cleaned
+        return _clean_column_name_cached(column_name)
     
     def calculate_similarity(self, str1: str, str2: str) -> float:
         """
@@ -464,8 +413,7 @@ class ExcelProcessor:
         Returns:
             相似度 (0-1)
         """
-        # 使用SequenceMatcher计算相似度
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+        return calculate_similarity(str1, str2)
     
     def find_similar_columns(self, target_column: str, available_columns: List[str]) -> List[Tuple[str, float]]:
         """
@@ -478,32 +426,54 @@ class ExcelProcessor:
         Returns:
             相似列名列表，包含相似度
         """
-        similar_columns = []
-        cleaned_target = self.clean_column_name(target_column)
+        return self.find_similar_columns_batch([target_column], available_columns)[0]
+    
+    def find_similar_columns_batch(self, target_columns: List[str], available_columns: List[str]) -> List[List[Tuple[str, float]]]:
+        """
+        批量查找与多个目标列名相似的列名（列名只清理一次，供所有两两比较复用）
         
-        for column in available_columns:
-            cleaned_column = self.clean_column_name(column)
-            
-            # 精确匹配
-            if cleaned_target == cleaned_column:
-                similar_columns.append((column, 1.0))
-                continue
-            
-            # 计算相似度
-            similarity = self.calculate_similarity(cleaned_target, cleaned_column)
+        Args:
+            target_columns: 目标列名列表
+            available_columns: 可用列名列表
             
-            # 检查是否是常见变体
-            for standard_name, variants in self.common_column_variants.items():
-                if cleaned_target in variants and cleaned_column in variants:
+        Returns:
+            与target_columns一一对应的相似列名列表，每项包含相似度
+        """
+        cleaned_targets = [self.clean_column_name(column) for column in target_columns]
+        cleaned_columns = [self.clean_column_name(column) for column in available_columns]
+        # 比较时不区分大小写，长度按小写形式计算
+        target_lengths = [len(target.lower()) for target in cleaned_targets]
+        column_lengths = [len(column.lower()) for column in cleaned_columns]
+        
+        results = []
+        for cleaned_target, target_len in zip(cleaned_targets, target_lengths):
+            similar_columns = []
+            target_standard = self._variant_to_standard.get(cleaned_target)
+            for column, cleaned_column, column_len in zip(available_columns, cleaned_columns, column_lengths):
+                # 精确匹配
+                if cleaned_target == cleaned_column:
+                    similar_columns.append((column, 1.0))
+                    continue
+                
+                # 计算相似度
+                # 相似度上限为 2*min(len)/(len1+len2)，长度相差过大时不可能达到阈值，跳过完整计算
+                if 2 * min(target_len, column_len) < self.similarity_threshold * (target_len + column_len):
+                    similarity = 0.0
+                else:
+                    similarity = self.calculate_similarity(cleaned_target, cleaned_column)
+                
+                # 检查是否是常见变体
+                if target_standard is not None and self._variant_to_standard.get(cleaned_column) == target_standard:
                     similarity = max(similarity, 0.9)  # 提高变体的相似度
-                    break
+                
+                if similarity >= self.similarity_threshold:
+                    similar_columns.append((column, similarity))
             
-            if similarity >= self.similarity_threshold:
-                similar_columns.append((column, similarity))
+            # 按相似度排序
+            similar_columns.sort(key=itemgetter(1), reverse=True)
+            results.append(similar_columns)
         
-        # 按相似度排序
-        similar_columns.sort(key=lambda x: x[1], reverse=True)
-        return similar_columns
+        return results
     
     def smart_column_mapping(self, required_columns: List[str], available_columns: List[str]) -> Dict[str, str]:
         """
@@ -516,9 +486,21 @@ class ExcelProcessor:
         Returns:
             列名映射字典
         """
+        # 表头与之前处理过的文件完全相同时，直接复用当时的映射结果（包括用户的确认选择）
+        cache_key = (tuple(required_columns), tuple(available_columns))
+        cached_mapping = self._column_mapping_cache.get(cache_key)
+        if cached_mapping is not None:
+            print(f"\n♻️  列名与之前处理的文件完全相同，复用列名映射")
+            if cached_mapping:
+                print(f"\n📋 列名映射结果:")
+                for required, mapped in cached_mapping.items():
+                    print(f"  {mapped} -> {required}")
+            return dict(cached_mapping)
+        
         mapping = {}
         unmapped_required = []
-        unmapped_available = available_columns.copy()
+        # 使用有序字典作为有序集合：O(1) 的成员判断与删除，同时保留列的原始顺序
+        unmapped_available = dict.fromkeys(available_columns)
         
         print(f"\n🔍 智能列名映射分析...")
         print(f"📋 需要的列名: {required_columns}")
@@ -529,23 +511,25 @@ class ExcelProcessor:
             matched = False
             
             # 检查精确匹配
-            if required in available_columns:
+            if required in unmapped_available:
                 mapping[required] = required
-                unmapped_available.remove(required)
+                del unmapped_available[required]
                 print(f"✅ 精确匹配: {required} -> {required}")
                 matched = True
                 continue
             
             # 检查常见变体
             if required in self.common_column_variants:
-                variants = self.common_column_variants[required]
-                for variant in variants:
-                    if variant in available_columns:
-                        mapping[required] = variant
-                        unmapped_available.remove(variant)
-                        print(f"✅ 变体匹配: {variant} -> {required}")
-                        matched = True
-                        break
+                # 按优先顺序取第一个尚未被占用的变体，避免同一列被映射到多个字段
+                variant = next(
+                    (variant for variant in self.common_column_variants[required] if variant in unmapped_available),
+                    None
+                )
+                if variant is not None:
+                    mapping[required] = variant
+                    del unmapped_available[variant]
+                    print(f"✅ 变体匹配: {variant} -> {required}")
+                    matched = True
             
             if not matched:
                 unmapped_required.append(required)
@@ -553,8 +537,14 @@ class ExcelProcessor:
         # 第二轮：模糊匹配
         if unmapped_required and unmapped_available:
             print(f"\n🔍 进行模糊匹配...")
-            for required in unmapped_required:
-                similar_columns = self.find_similar_columns(required, unmapped_available)
+            # 一次性计算所有未映射字段与剩余列名的相似度矩阵，循环中只过滤已被占用的列
+            batch_similar = dict(zip(unmapped_required, self.find_similar_columns_batch(unmapped_required, list(unmapped_available))))
+            # 遍历副本，映射成功的字段可以直接从 unmapped_required 中移除
+            for required in list(unmapped_required):
+                similar_columns = [
+                    (column, similarity) for column, similarity in batch_similar[required]
+                    if column in unmapped_available
+                ]
                 
                 if similar_columns:
                     best_match, similarity = similar_columns[0]
@@ -563,19 +553,38 @@ class ExcelProcessor:
                     # 如果相似度为1.00，自动确认映射
                     if similarity >= 1.0:
                         mapping[required] = best_match
-                        unmapped_available.remove(best_match)
+                        del unmapped_available[best_match]
+                        unmapped_required.remove(required)
                         print(f"✅ 自动映射 (完全匹配): {best_match} -> {required}")
                     else:
-                        # 询问用户是否确认映射
-                        confirm = input(f"是否将文件列名 '{best_match}' 映射到标准字段 '{required}'？(y/n，默认y): ").strip().lower()
-                        if confirm not in ['n', 'no', '否']:
-                            mapping[required] = best_match
-                            unmapped_available.remove(best_match)
-                            print(f"✅ 确认映射: {best_match} -> {required}")
+                        if self.resolution_policy is not None:
+                            # 使用映射策略代替逐个询问
+                            selected_column = self.resolution_policy(required, similar_columns)
+                        else:
+                            # 询问用户是否确认映射
+                            confirm = input(f"是否将文件列名 '{best_match}' 映射到标准字段 '{required}'？(y/n，默认y): ").strip().lower()
+                            selected_column = best_match if confirm not in ['n', 'no', '否'] else None
+                        
+                        if selected_column is not None and selected_column in unmapped_available:
+                            mapping[required] = selected_column
+                            del unmapped_available[selected_column]
+                            unmapped_required.remove(required)
+                            print(f"✅ 确认映射: {selected_column} -> {required}")
                         else:
                             print(f"⚠️  跳过映射: {required}")
                 else:
                     print(f"❌ 未找到与 '{required}' 相似的列名")
+                    if self.resolution_policy is not None:
+                        selected_column = self.resolution_policy(required, [])
+                        if selected_column is not None and selected_column in unmapped_available:
+                            mapping[required] = selected_column
+                            del unmapped_available[selected_column]
+                            unmapped_required.remove(required)
+                            print(f"✅ 策略映射: {selected_column} -> {required}")
+                        else:
+                            print(f"⚠️  跳过映射: {required}")
+                        continue
+                    
                     print(f"🤔 请选择:")
                     print(f"  1. 手动选择列名 (输入 'm')")
                     print(f"  2. 跳过此字段 (输入 's')")
@@ -586,10 +595,10 @@ class ExcelProcessor:
                             print(f"⚠️  跳过映射: {required}")
                             break
                         elif choice == 'm':
-                            selected_column = self._manual_select_column(required, unmapped_available)
+                            selected_column = self._manual_select_column(required, list(unmapped_available))
                             if selected_column:
                                 mapping[required] = selected_column
-                                unmapped_available.remove(selected_column)
+                                del unmapped_available[selected_column]
                                 unmapped_required.remove(required)
                                 print(f"✅ 手动映射: {selected_column} -> {required}")
                             break
@@ -605,6 +614,7 @@ class ExcelProcessor:
         if unmapped_required:
             print(f"\n⚠️  未映射的列名: {unmapped_required}")
         
+        self._column_mapping_cache[cache_key] = dict(mapping)
         return mapping
     
     def validate_required_columns(self, df: pd.DataFrame, required_columns: List[str]) -> Tuple[bool, List[str], Dict[str, str]]:
@@ -629,6 +639,9 @@ class ExcelProcessor:
                     missing_columns.append(required)
                 else:
                     column_mapping[required] = required
+        elif set(required_columns).issubset(available_columns):
+            # 所有必需列名都精确存在，无需进行智能匹配
+            column_mapping = {required: required for required in required_columns}
         else:
             # 智能匹配
             column_mapping = self.smart_column_mapping(required_columns, available_columns)
@@ -655,9 +668,7 @@ class ExcelProcessor:
             return pattern == text
         
         # 将 * 转换为正则表达式的 . 字符
-        regex_pattern = pattern.replace('*', '.')
-        import re
-        return bool(re.match(regex_pattern, text))
+        return bool(_compile_wildcard(pattern, False).match(text))
     
     def flexible_wildcard_match(self, pattern: str, text: str) -> bool:
         """
@@ -674,17 +685,16 @@ class ExcelProcessor:
             return pattern == text
         
         # 将 * 转换为正则表达式的 .* 字符（匹配任意字符序列）
-        regex_pattern = pattern.replace('*', '.*')
-        import re
-        return bool(re.match(regex_pattern, text))
+        return bool(_compile_wildcard(pattern, True).match(text))
     
-    def enhanced_field_matching(self, pattern: str, all_fields: List[str]) -> Tuple[List[str], str]:
+    def enhanced_field_matching(self, pattern: str, all_fields: List[str], lowered_fields: Optional[List[str]] = None) -> Tuple[List[str], str]:
         """
         增强的字段匹配函数，支持多种匹配方式
         
         Args:
             pattern: 匹配模式
             all_fields: 所有可用字段列表
+            lowered_fields: 与 all_fields 一一对应的小写字段名，多次调用时由调用方预先计算一次
             
         Returns:
             (匹配的字段列表, 匹配类型描述)
@@ -699,8 +709,11 @@ class ExcelProcessor:
             if matched_fields:
                 return matched_fields, "通配符匹配"
         
-        # 3. 包含匹配（模糊匹配）
-        matched_fields = [field for field in all_fields if pattern.lower() in field.lower()]
+        # 3. 包含匹配（模糊匹配），模式只转换一次小写
+        lowered_pattern = pattern.lower()
+        if lowered_fields is None:
+            lowered_fields = [field.lower() for field in all_fields]
+        matched_fields = [field for field, lowered in zip(all_fields, lowered_fields) if lowered_pattern in lowered]
         if matched_fields:
             return matched_fields, "包含匹配"
         
@@ -722,13 +735,23 @@ class ExcelProcessor:
             # 精确匹配
             return [field for field in all_fields if field == pattern]
         
-        # 通配符匹配
-        matched_fields = []
-        for field in all_fields:
-            if self.flexible_wildcard_match(pattern, field):
-                matched_fields.append(field)
-        
-        return matched_fields
+        # * 只出现在开头和/或结尾时（如 学*、*学号、*学号*），直接用字符串方法判断，无需正则
+        body = pattern.strip('*')
+        if '*' not in body:
+            if pattern.startswith('*') and pattern.endswith('*'):
+                return [field for field in all_fields if body in field]
+            if pattern.endswith('*'):
+                return [field for field in all_fields if field.startswith(body)]
+            return [field for field in all_fields if field.endswith(body)]
+        
+        # 通配符匹配：将所有字段用分隔符拼接后一次扫描完成，避免逐个字段调用正则
+        fields_blob = _FIELD_SEPARATOR.join(all_fields)
+        if fields_blob.count(_FIELD_SEPARATOR) == len(all_fields) - 1:
+            return _compile_wildcard_blob(pattern).findall(fields_blob)
+        
+        # 字段中本身含有分隔符时退回逐个匹配
+        regex = _compile_wildcard(pattern, True)
+        return [field for field in all_fields if regex.match(field)]
     
     def select_fields(self, all_fields: List[str]) -> List[str]:
         """
@@ -765,8 +788,8 @@ class ExcelProcessor:
             for i in range(start_idx, end_idx):
                 field = all_fields[i]
                 if show_occurrence:
-                    # 计算该字段的出现次数
-                    occurrence_count = sum(1 for f in self.selected_files if field in self.get_file_fields(f))
+                    # 使用字段分析阶段已统计好的出现次数，无需重新读取文件
+                    occurrence_count = self.field_occurrence.get(field, 0)
                     print(f"{i + 1:2d}. {field:<25} (出现在 {occurrence_count} 个文件中)")
                 else:
                     print(f"{i + 1:2d}. {field}")
@@ -807,6 +830,8 @@ class ExcelProcessor:
                 # 解析用户选择
                 selected_items = [item.strip() for item in choice.split(',')]
                 self.selected_fields = []
+                # 字段名的小写形式只计算一次，供每个输入项的包含匹配复用
+                lowered_fields = [field.lower() for field in all_fields]
                 
                 for item in selected_items:
                     # 尝试作为数字处理
@@ -818,7 +843,7 @@ class ExcelProcessor:
                             print(f"⚠️  字段编号 {item} 超出范围，跳过")
                     except ValueError:
                         # 使用增强的字段匹配函数
-                        matched_fields, match_type = self.enhanced_field_matching(item, all_fields)
+                        matched_fields, match_type = self.enhanced_field_matching(item, all_fields, lowered_fields)
                         
                         if len(matched_fields) == 1:
                             # 单个匹配，直接添加
@@ -863,14 +888,8 @@ class ExcelProcessor:
                     print("❌ 未选择任何有效字段，请重新选择")
                     return self.select_fields(all_fields)
                 
-                # 去重并保持顺序
-                seen = set()
-                unique_fields = []
-                for field in self.selected_fields:
-                    if field not in seen:
-                        seen.add(field)
-                        unique_fields.append(field)
-                self.selected_fields = unique_fields
+                # 去重并保持顺序（dict 保留插入顺序）
+                self.selected_fields = list(dict.fromkeys(self.selected_fields))
                 
                 print(f"✅ 已选择 {len(self.selected_fields)} 个字段:")
                 for field in self.selected_fields:
@@ -948,6 +967,8 @@ class ExcelProcessor:
                 # 解析用户选择
                 selected_items = [item.strip() for item in choice.split(',')]
                 self.dedup_fields = []
+                # 字段名的小写形式只计算一次，供每个输入项的包含匹配复用
+                lowered_fields = [field.lower() for field in self.selected_fields]
                 
                 for item in selected_items:
                     # 尝试作为数字处理
@@ -959,7 +980,7 @@ class ExcelProcessor:
                             print(f"⚠️  字段编号 {item} 超出范围，跳过")
                     except ValueError:
                         # 使用增强的字段匹配函数
-                        matched_fields, match_type = self.enhanced_field_matching(item, self.selected_fields)
+                        matched_fields, match_type = self.enhanced_field_matching(item, self.selected_fields, lowered_fields)
                         
                         if len(matched_fields) == 1:
                             # 单个匹配，直接添加
@@ -1004,14 +1025,8 @@ class ExcelProcessor:
                     print("❌ 未选择任何有效字段，请重新选择")
                     return self.configure_deduplication()
                 
-                # 去重并保持顺序
-                seen = set()
-                unique_fields = []
-                for field in self.dedup_fields:
-                    if field not in seen:
-                        seen.add(field)
-                        unique_fields.append(field)
-                self.dedup_fields = unique_fields
+                # 去重并保持顺序（dict 保留插入顺序）
+                self.dedup_fields = list(dict.fromkeys(self.dedup_fields))
                 
                 print(f"✅ 已选择 {len(self.dedup_fields)} 个字段进行去重:")
                 for field in self.dedup_fields:
@@ -1039,6 +1054,7 @@ class ExcelProcessor:
         """
         print(f"\n=== 步骤5: 数据处理 ===")
         all_data = []
+        read_plans = []  # (文件, 表头, 读取的列位置, 映射后的列名, 缺失字段默认值)
         total_rows = 0
         
         print("🔄 开始处理文件...")
@@ -1046,7 +1062,10 @@ class ExcelProcessor:
         for i, file in enumerate(files, 1):
             try:
                 print(f"\n📄 处理文件 {i}/{len(files)}: {os.path.basename(file)}")
-                df = pd.read_excel(file)
+                # 先只用表头进行字段验证，确定需要的列之后再读取数据
+                headers = self._read_headers(file)
+                df = pd.DataFrame(columns=headers)
+                default_values = {}
                 
                 # 使用智能列名匹配验证必需字段
                 is_valid, missing_fields, column_mapping = self.validate_required_columns(df, selected_fields)
@@ -1092,6 +1111,7 @@ class ExcelProcessor:
                             
                             # 在数据框中添加缺失字段，填充默认值
                             df[field] = default_value
+                            default_values[field] = default_value
                             print(f"📝 为缺失字段 '{field}' 填充默认值: {default_value}")
                     
                     # 重新验证字段
@@ -1104,8 +1124,9 @@ class ExcelProcessor:
                 mapped_fields = [column_mapping.get(field, field) for field in selected_fields]
                 print(f"📋 使用映射后的列名: {mapped_fields}")
                 
-                # 使用映射后的列名提取数据
-                selected_data = df[mapped_fields].copy()
+                # 只读取映射后需要的列（usecols 使用列位置，列名沿用表头中的名称）
+                header_positions = {column: position for position, column in enumerate(headers)}
+                usecols = sorted({header_positions[field] for field in mapped_fields if field in header_positions})
                 
                 # 将列名重命名为标准名称，并按照用户选择的顺序重新排列
                 rename_mapping = {}
@@ -1114,26 +1135,48 @@ class ExcelProcessor:
                         rename_mapping[mapped_fields[i]] = field
                 
                 if rename_mapping:
-                    selected_data = selected_data.rename(columns=rename_mapping)
                     print(f"📝 列名重命名: {rename_mapping}")
-                
-                # 按照用户选择的字段顺序重新排列列
-                selected_data = selected_data[selected_fields]
                 print(f"📋 按用户选择顺序排列字段: {selected_fields}")
                 
-                # 添加文件来源信息
-                selected_data['数据来源文件'] = os.path.basename(file)
-                selected_data['数据来源路径'] = os.path.abspath(file)
-                
-                all_data.append(selected_data)
-                file_rows = len(selected_data)
-                total_rows += file_rows
-                print(f"✅ 成功读取 {file_rows} 行数据")
+                read_plans.append((file, headers, usecols, mapped_fields, default_values))
                 
             except Exception as e:
                 print(f"❌ 错误：处理文件 '{os.path.basename(file)}' 时出错: {str(e)}")
                 continue
         
+        # 字段验证需要与用户交互，已按顺序完成；各文件的数据读取互不依赖，使用线程池并发执行
+        if read_plans:
+            print(f"\n📥 正在读取 {len(read_plans)} 个文件的数据...")
+        with ThreadPoolExecutor(max_workers=io_worker_count(len(read_plans))) as executor:
+            futures = [
+                executor.submit(self._read_selected_columns, file, headers, usecols)
+                for file, headers, usecols, _, _ in read_plans
+            ]
+            # 按文件顺序收集结果，保证合并后的行顺序与串行读取一致
+            for (file, _, _, mapped_fields, default_values), future in zip(read_plans, futures):
+                try:
+                    df = future.result()
+                    for field, default_value in default_values.items():
+                        df[field] = default_value
+                    
+                    # 按用户选择的字段顺序提取映射后的列（按列名选取，缺少列时直接报错），
+                    # 再按位置换成标准字段名，一次完成重命名和重新排列
+                    selected_data = df.loc[:, mapped_fields]
+                    selected_data.columns = selected_fields
+                    
+                    # 添加文件来源信息
+                    selected_data['数据来源文件'] = os.path.basename(file)
+                    selected_data['数据来源路径'] = os.path.abspath(file)
+                    
+                    all_data.append(selected_data)
+                    file_rows = len(selected_data)
+                    total_rows += file_rows
+                    print(f"✅ 文件 '{os.path.basename(file)}' 成功读取 {file_rows} 行数据")
+                    
+                except Exception as e:
+                    print(f"❌ 错误：处理文件 '{os.path.basename(file)}' 时出错: {str(e)}")
+                    continue
+        
         if not all_data:
             print("❌ 没有成功读取任何数据")
             return pd.DataFrame()
@@ -1141,6 +1184,8 @@ class ExcelProcessor:
         # 合并所有数据
         print(f"\n🔄 正在合并数据...")
         combined_df = pd.concat(all_data, ignore_index=True)
+        # 合并后各文件的数据框已不再需要，立即释放，避免去重阶段同时持有两份数据
+        all_data.clear()
         print(f"✅ 合并完成，总行数: {len(combined_df)}")
         
 
@@ -1178,11 +1223,16 @@ class ExcelProcessor:
                 print(f"  👤 姓名字段: None")
             
             # 查找重复记录（基于去重字段）
-            duplicated_mask = combined_df.duplicated(subset=dedup_fields, keep=False)
+            # 只对去重字段做一次分组编号，之后的重复判断和分组遍历都复用这份编号
+            group_codes = self._dedup_group_codes(combined_df, dedup_fields)
+            group_sizes = np.bincount(group_codes)
+            duplicated_mask = group_sizes[group_codes] > 1
             duplicated_records = combined_df[duplicated_mask]
+            duplicated_codes = group_codes[duplicated_mask]
+            total_duplicate_groups = int((group_sizes > 1).sum())
             
-            # 保存重复记录到实例变量
-            self.duplicate_records = duplicated_records.copy()
+            # 保存重复记录到实例变量（布尔索引已生成独立的数据框，且之后不会被修改，无需再复制）
+            self.duplicate_records = duplicated_records
             self.duplicate_count = len(duplicated_records)
             
             if len(duplicated_records) > 0:
@@ -1190,176 +1240,164 @@ class ExcelProcessor:
                 print(f"📋 发现重复记录详情")
                 print(f"🔍" + "="*58)
                 print(f"📊 重复记录总数: {len(duplicated_records)} 条")
-                print(f"📊 重复组数量: {duplicated_records.groupby(dedup_fields).ngroups} 组")
+                print(f"📊 重复组数量: {total_duplicate_groups} 组")
                 print(f"🔑 去重依据字段: {', '.join(dedup_fields)}")
                 
-                # 按去重字段分组显示重复记录
-                duplicate_groups = duplicated_records.groupby(dedup_fields)
-                group_count = 0
-                conflict_group_count = 0  # 有冲突的组数量
+                # 一次性判断所有重复组是否存在冲突，只取出前10组有冲突的重复记录用于显示
+                conflict_flags = self._conflict_group_flags(duplicated_records, duplicated_codes, dedup_fields, student_name_field)
+                conflict_codes = conflict_flags.index[conflict_flags.to_numpy()]
+                conflict_group_count = len(conflict_codes)  # 有冲突的组数量
+                display_mask = np.isin(duplicated_codes, conflict_codes[:10])  # 最多显示前10组有冲突的重复记录
+                duplicate_groups = self._iter_code_groups(duplicated_records[display_mask], duplicated_codes[display_mask], dedup_fields)
                 
-                for group_key, group_df in duplicate_groups:
-                    # 检查这个组是否有真正的冲突（学号相同但姓名不同）
-                    has_conflict = self._group_has_student_name_conflict(group_df, dedup_fields, student_name_field)
+                for display_index, (group_key, group_df) in enumerate(duplicate_groups, 1):
+                    print(f"\n  {'='*50}")
+                    print(f"  📝 冲突重复组 {display_index} (共 {len(group_df)} 条重复记录)")
+                    print(f"  {'='*50}")
                     
-                    if has_conflict:
-                        conflict_group_count += 1
-                        if conflict_group_count <= 10:  # 最多显示前10组有冲突的重复记录
-                            print(f"\n  {'='*50}")
-                            print(f"  📝 冲突重复组 {conflict_group_count} (共 {len(group_df)} 条重复记录)")
-                            print(f"  {'='*50}")
-                            
-                            # 显示重复字段的值
-                            if isinstance(group_key, tuple):
-                                for i, field in enumerate(dedup_fields):
-                                    display_value = self._format_display_value(group_key[i])
-                                    print(f"  🔑 {field}: {display_value}")
-                            else:
-                                display_value = self._format_display_value(group_key)
-                                print(f"  🔑 {dedup_fields[0]}: {display_value}")
-                            
-                            # 定义非去重字段列表（在使用前定义）
-                            non_dedup_fields = [field for field in group_df.columns if field not in dedup_fields]
-                            
-                            # 显示涉及的文件
-                            if '数据来源文件' in group_df.columns:
-                                # 基于文件名+路径去重
-                                file_refs = group_df[['数据来源文件', '数据来源路径']].drop_duplicates()
-                                # 先做逐文件校验，得到可用文件清单
-                                verified_by_path: Dict[str, bool] = {}
-                                for _, ref in file_refs.iterrows():
-                                    full_path = str(ref['数据来源路径'])
-                                    try:
-                                        ok = self._verify_group_key_in_file(full_path, dedup_fields, group_key)
-                                    except Exception:
-                                        ok = False
-                                    verified_by_path[full_path] = ok
+                    # 显示重复字段的值
+                    if isinstance(group_key, tuple):
+                        for i, field in enumerate(dedup_fields):
+                            display_value = self._format_display_value(group_key[i])
+                            print(f"  🔑 {field}: {display_value}")
+                    else:
+                        display_value = self._format_display_value(group_key)
+                        print(f"  🔑 {dedup_fields[0]}: {display_value}")
+                    
+                    # 定义非去重字段列表（在使用前定义）
+                    non_dedup_fields = [field for field in group_df.columns if field not in dedup_fields]
+                    
+                    # 显示涉及的文件
+                    if '数据来源文件' in group_df.columns:
+                        # 基于文件名+路径去重
+                        file_refs = group_df[['数据来源文件', '数据来源路径']].drop_duplicates()
+                        # 先做逐文件校验，得到可用文件清单
+                        verified_by_path: Dict[str, bool] = {}
+                        for _, ref in file_refs.iterrows():
+                            full_path = str(ref['数据来源路径'])
+                            try:
+                                ok = self._verify_group_key_in_file(full_path, dedup_fields, group_key)
+                            except Exception:
+                                ok = False
+                            verified_by_path[full_path] = ok
 
-                                # 仅展示校验通过的文件
-                                verified_files = [str(ref['数据来源文件']) for _, ref in file_refs.iterrows() if verified_by_path.get(str(ref['数据来源路径']), False)]
-                                skipped_files = [str(ref['数据来源文件']) for _, ref in file_refs.iterrows() if not verified_by_path.get(str(ref['数据来源路径']), False)]
+                        # 仅展示校验通过的文件
+                        verified_files = [str(ref['数据来源文件']) for _, ref in file_refs.iterrows() if verified_by_path.get(str(ref['数据来源路径']), False)]
+                        skipped_files = [str(ref['数据来源文件']) for _, ref in file_refs.iterrows() if not verified_by_path.get(str(ref['数据来源路径']), False)]
 
-                                if verified_files:
-                                    print(f"  📁 涉及文件: {', '.join(verified_files)}")
-                                if skipped_files:
-                                    print(f"  ⚠️ 已忽略未在源文件找到的文件: {', '.join(skipped_files)}")
-                                
-                                # 调试信息：显示每个文件的记录数和具体内容（并校验是否真实存在）
-                                print(f"  🔍 详细分布:")
-                                for _, ref in file_refs.iterrows():
-                                    base_name = str(ref['数据来源文件'])
-                                    full_path = str(ref['数据来源路径'])
-                                    file_records = group_df[group_df['数据来源路径'] == full_path]
-                                    exists_in_src = verified_by_path.get(full_path, False)
-                                    # 只显示校验通过的文件详情
-                                    if not exists_in_src:
-                                        continue
-                                    print(f"     • {base_name}: {len(file_records)} 条记录")
-                                    print(f"       校验: ✅ 已在源文件找到")
-                                    
-                                    # 显示该文件中的具体记录内容（显示所有字段用于调试）
-                                    for idx, (_, record) in enumerate(file_records.iterrows()):
-                                        if idx >= 2:  # 最多显示2条记录
-                                            if len(file_records) > 2:
-                                                print(f"       ... 还有 {len(file_records) - 2} 条记录")
-                                            break
-                                        
-                                        record_info = []
-                                        # 显示所有字段（包括去重字段）用于调试
-                                        for field in group_df.columns:
-                                            if field in ('数据来源文件', '数据来源路径'):
-                                                continue
-                                            value = record[field]
-                                            if pd.notna(value) and str(value).strip():
-                                                display_value = self._format_display_value(value)
-                                                record_info.append(f"{field}={display_value}")
-                                            else:
-                                                record_info.append(f"{field}=<空值>")
-                                        
-                                        print(f"       [{idx+1}] {', '.join(record_info)}")
-                            
-                            print(f"  {'-'*40}")
+                        if verified_files:
+                            print(f"  📁 涉及文件: {', '.join(verified_files)}")
+                        if skipped_files:
+                            print(f"  ⚠️ 已忽略未在源文件找到的文件: {', '.join(skipped_files)}")
+                        
+                        # 调试信息：显示每个文件的记录数和具体内容（并校验是否真实存在）
+                        print(f"  🔍 详细分布:")
+                        for _, ref in file_refs.iterrows():
+                            base_name = str(ref['数据来源文件'])
+                            full_path = str(ref['数据来源路径'])
+                            file_records = group_df[group_df['数据来源路径'] == full_path]
+                            exists_in_src = verified_by_path.get(full_path, False)
+                            # 只显示校验通过的文件详情
+                            if not exists_in_src:
+                                continue
+                            print(f"     • {base_name}: {len(file_records)} 条记录")
+                            print(f"       校验: ✅ 已在源文件找到")
                             
-                            # 调试：显示数据框的完整结构信息
-                            print(f"  🔧 调试信息:")
-                            # 只基于校验通过的行统计
-                            if '数据来源路径' in group_df.columns:
-                                verified_mask = group_df['数据来源路径'].map(lambda p: verified_by_path.get(str(p), False))
-                                group_df_verified = group_df[verified_mask] if verified_mask.any() else group_df.iloc[0:0]
-                            else:
-                                group_df_verified = group_df
+                            # 显示该文件中的具体记录内容（显示所有字段用于调试，最多显示2条记录）
+                            # 先按列格式化显示值，再逐行拼接，避免 iterrows 为每行构造 Series
+                            preview_records = file_records.head(2)
+                            preview_fields = [field for field in group_df.columns if field not in ('数据来源文件', '数据来源路径')]
+                            preview_columns = [
+                                preview_records[field].map(
+                                    lambda value: self._format_display_value(value) if pd.notna(value) and str(value).strip() else "<空值>"
+                                ).tolist()
+                                for field in preview_fields
+                            ]
+                            for idx, row_values in enumerate(zip(*preview_columns)):
+                                record_info = [f"{field}={value}" for field, value in zip(preview_fields, row_values)]
+                                print(f"       [{idx+1}] {', '.join(record_info)}")
+                            if len(file_records) > 2:
+                                print(f"       ... 还有 {len(file_records) - 2} 条记录")
+                    
+                    print(f"  {'-'*40}")
+                    
+                    # 调试：显示数据框的完整结构信息
+                    print(f"  🔧 调试信息:")
+                    # 只基于校验通过的行统计
+                    if '数据来源路径' in group_df.columns:
+                        verified_mask = group_df['数据来源路径'].map(lambda p: verified_by_path.get(str(p), False))
+                        group_df_verified = group_df[verified_mask] if verified_mask.any() else group_df.iloc[0:0]
+                    else:
+                        group_df_verified = group_df
 
-                            print(f"     • 数据框形状: {group_df_verified.shape}")
-                            print(f"     • 所有字段: {list(group_df.columns)}")
-                            print(f"     • 去重字段: {dedup_fields}")
-                            print(f"     • 非去重字段: {non_dedup_fields}")
-                            
-                            # 分析并显示冲突的具体情况
-                            conflict_summary = {}
-                            
-                            # 找出每个字段的不同值（排除文件来源字段）
-                            for field in non_dedup_fields:
-                                if field in ('数据来源文件', '数据来源路径'):  # 跳过文件来源字段
-                                    continue
-                                unique_vals = []
-                                seen = set()
-                                for value in group_df_verified[field] if not group_df_verified.empty else []:
-                                    if pd.isna(value):
-                                        str_val = "<空值>"
-                                    else:
-                                        str_val = str(value).strip()
-                                    if str_val not in seen:
-                                        seen.add(str_val)
-                                        unique_vals.append(str_val)
-                                
-                                if len([v for v in unique_vals if v != "<空值>"]) > 1:
-                                    conflict_summary[field] = unique_vals
-                            
-                            # 显示冲突字段的不同值（汇总：每个取值的数量与来源文件）
-                            if conflict_summary:
-                                print(f"  🔍 冲突字段及其不同值（按取值统计）:")
-                                for field in conflict_summary:
-                                    # 为该字段统计不同取值的数量与来源文件
-                                    value_to_count: Dict[str, int] = {}
-                                    value_to_files: Dict[str, set] = {}
+                    print(f"     • 数据框形状: {group_df_verified.shape}")
+                    print(f"     • 所有字段: {list(group_df.columns)}")
+                    print(f"     • 去重字段: {dedup_fields}")
+                    print(f"     • 非去重字段: {non_dedup_fields}")
+                    
+                    # 分析并显示冲突的具体情况
+                    conflict_summary = {}
+                    
+                    # 找出每个字段的不同值（排除文件来源字段）
+                    for field in non_dedup_fields:
+                        if field in ('数据来源文件', '数据来源路径'):  # 跳过文件来源字段
+                            continue
+                        # 归一化后按出现顺序去重
+                        unique_vals = list(dict.fromkeys(
+                            "<空值>" if pd.isna(value) else str(value).strip()
+                            for value in group_df_verified[field]
+                        ))
+                        
+                        if len([v for v in unique_vals if v != "<空值>"]) > 1:
+                            conflict_summary[field] = unique_vals
+                    
+                    # 显示冲突字段的不同值（汇总：每个取值的数量与来源文件）
+                    if conflict_summary:
+                        print(f"  🔍 冲突字段及其不同值（按取值统计）:")
+                        for field in conflict_summary:
+                            # 为该字段统计不同取值的数量与来源文件
+                            value_to_count: Dict[str, int] = {}
+                            value_to_files: Dict[str, set] = {}
 
-                                    for _, row in group_df_verified.iterrows() if not group_df_verified.empty else []:
-                                        raw_val = row[field]
-                                        if pd.isna(raw_val) or (isinstance(raw_val, str) and raw_val.strip() == ""):
-                                            disp_val = "<空值>"
-                                        else:
-                                            disp_val = self._format_display_value(raw_val).strip()
+                            for _, row in group_df_verified.iterrows() if not group_df_verified.empty else []:
+                                raw_val = row[field]
+                                if pd.isna(raw_val) or (isinstance(raw_val, str) and raw_val.strip() == ""):
+                                    disp_val = "<空值>"
+                                else:
+                                    disp_val = self._format_display_value(raw_val).strip()
 
-                                        value_to_count[disp_val] = value_to_count.get(disp_val, 0) + 1
-                                        if '数据来源文件' in group_df.columns:
-                                            src_file = row['数据来源文件']
-                                            value_to_files.setdefault(disp_val, set()).add(str(src_file))
+                                value_to_count[disp_val] = value_to_count.get(disp_val, 0) + 1
+                                if '数据来源文件' in group_df.columns:
+                                    src_file = row['数据来源文件']
+                                    value_to_files.setdefault(disp_val, set()).add(str(src_file))
 
-                                    # 仅保留非空值用于冲突展示
-                                    non_empty_items = [(v, c) for v, c in value_to_count.items() if v != "<空值>"]
-                                    # 按数量降序
-                                    non_empty_items.sort(key=lambda x: x[1], reverse=True)
+                            # 仅保留非空值用于冲突展示
+                            non_empty_items = [(v, c) for v, c in value_to_count.items() if v != "<空值>"]
+                            # 按数量降序
+                            non_empty_items.sort(key=lambda x: x[1], reverse=True)
 
-                                    print(f"     • {field}: 共 {len(non_empty_items)} 种不同取值")
-                                    for val, cnt in non_empty_items:
-                                        files_list = sorted(list(value_to_files.get(val, [])))
-                                        files_str = ", ".join(files_list) if files_list else "-"
-                                        print(f"       - {val}: {cnt} 条 (来源: {files_str})")
+                            print(f"     • {field}: 共 {len(non_empty_items)} 种不同取值")
+                            for val, cnt in non_empty_items:
+                                files_list = sorted(list(value_to_files.get(val, [])))
+                                files_str = ", ".join(files_list) if files_list else "-"
+                                print(f"       - {val}: {cnt} 条 (来源: {files_str})")
 
-                                print(f"  {'-'*40}")
+                        print(f"  {'-'*40}")
 
-                            # 统计说明（不再展示样本记录，避免重复与误解）
-                            total_shown = len(group_df_verified) if not group_df_verified.empty else 0
-                            print(f"  💡 已基于校验通过的 {total_shown} 条记录进行统计展示。")
+                    # 统计说明（不再展示样本记录，避免重复与误解）
+                    total_shown = len(group_df_verified) if not group_df_verified.empty else 0
+                    print(f"  💡 已基于校验通过的 {total_shown} 条记录进行统计展示。")
 
-                            # 显示统计信息
-                            if len(group_df_verified) > 0:
-                                remaining = 0  # 已以汇总方式展示，不再单独显示样本与剩余条目
-                                if remaining > 0:
-                                    print(f"  💡 还有 {remaining} 条记录与上述取值重复")
+                    # 显示统计信息
+                    if len(group_df_verified) > 0:
+                        remaining = 0  # 已以汇总方式展示，不再单独显示样本与剩余条目
+                        if remaining > 0:
+                            print(f"  💡 还有 {remaining} 条记录与上述取值重复")
+                
+                # 重复组显示完毕，释放校验时缓存的源文件数据
+                self._verify_source_cache.clear()
                 
                 # 更新统计信息显示
-                total_duplicate_groups = duplicated_records.groupby(dedup_fields).ngroups
                 if conflict_group_count > 0:
                     print(f"\n📊 统计信息:")
                     print(f"  📋 总重复组数: {total_duplicate_groups}")
@@ -1375,10 +1413,12 @@ class ExcelProcessor:
             # 执行去重处理
             if len(duplicated_records) > 0:
                 processed_records = []
-                duplicate_groups = duplicated_records.groupby(dedup_fields)
+                duplicate_groups = self._iter_code_groups(duplicated_records, duplicated_codes, dedup_fields)
                 conflicts_found = 0
+                processed_group_count = 0
                 
                 for group_key, group_df in duplicate_groups:
+                    processed_group_count += 1
                     resolved_records, had_conflict = self.resolve_student_conflicts(group_key, group_df, dedup_fields, student_name_field, student_id_field)
                     if not resolved_records.empty:
                         processed_records.append(resolved_records)
@@ -1406,7 +1446,7 @@ class ExcelProcessor:
                         print(f"  📊 发现{name_icon}冲突的{id_icon}: {conflicts_found} 个")
                     else:
                         print(f"  📊 发现字段冲突的重复组: {conflicts_found} 个")
-                    print(f"  ✅ 自动合并的重复记录: {len(duplicate_groups) - conflicts_found} 组")
+                    print(f"  ✅ 自动合并的重复记录: {processed_group_count - conflicts_found} 组")
                 else:
                     if student_id_field and student_name_field:
                         id_icon = self._get_field_icon(student_id_field)
@@ -1414,19 +1454,12 @@ class ExcelProcessor:
                         print(f"\n✅ 去重处理完成: 所有重复记录都是{id_icon}+{name_icon}完全相同，已自动合并")
                     else:
                         print(f"\n✅ 去重处理完成: 所有重复记录都是完全相同的，已自动合并")
-                
-                # 更新重复记录统计，避免导出时长度不匹配
-                # 重新计算实际被处理的重复记录
-                if processed_records:
-                    # 保存原始的重复记录用于导出
-                    self.duplicate_records = duplicated_records.copy()
-                    # 更新重复记录数量为实际处理的数量
-                    self.duplicate_count = len(duplicated_records)
             else:
-                # 传统自动去重
-                combined_df = combined_df.drop_duplicates(subset=dedup_fields, keep='first')
-                after_count = len(combined_df)
-                removed_count = before_count - after_count
+                # 分组编号已表明每组只有一行，没有需要删除的重复记录，无需再对去重字段做一次 drop_duplicates
+                after_count = before_count
+                removed_count = 0
+            
+            self.removed_count = removed_count
             
             print(f"\n✅ 去重完成:")
             print(f"  📊 去重前行数: {before_count}")
@@ -1438,6 +1471,54 @@ class ExcelProcessor:
         
         return combined_df
     
+    def _dedup_group_codes(self, df: pd.DataFrame, dedup_fields: List[str]) -> np.ndarray:
+        """
+        计算每行所属的重复组编号
+        
+        编号顺序与 groupby(dedup_fields) 的分组顺序一致（按键值排序），去重字段为空值的行同样参与分组
+        
+        Args:
+            df: 数据框
+            dedup_fields: 去重字段列表
+            
+        Returns:
+            与 df 行一一对应的组编号数组
+        """
+        # 逐列 factorize 得到整数编码后再组合，后续只需对整数做哈希，也不必修改原列的数据类型
+        codes = np.zeros(len(df), dtype=np.intp)
+        for field in dedup_fields:
+            field_codes, field_uniques = pd.factorize(df[field], sort=True, use_na_sentinel=False)
+            # 每合并一列就重新压缩编号，避免多列组合时整数溢出
+            codes, _ = pd.factorize(codes * len(field_uniques) + field_codes, sort=True)
+        return codes.astype(np.intp, copy=False)
+    
+    def _iter_code_groups(self, df: pd.DataFrame, codes: np.ndarray, dedup_fields: List[str]):
+        """
+        按组编号依次产出重复组，组内保持原有的行顺序
+        
+        Args:
+            df: 数据框
+            codes: 与 df 行一一对应的组编号
+            dedup_fields: 去重字段列表
+            
+        Yields:
+            (组键值元组, 组数据框)
+        """
+        if len(codes) == 0:
+            return
+        
+        # 稳定排序后相同编号的行连续排列，按编号变化的位置切分即可得到各组
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(codes)]))
+        key_positions = df.columns.get_indexer(dedup_fields)
+        
+        for start, end in zip(starts, ends):
+            group_df = df.iloc[order[start:end]]
+            group_key = tuple(group_df.iat[0, position] for position in key_positions)
+            yield group_key, group_df
+    
     def export_to_excel(self, df: pd.DataFrame, output_filename: str = None):
         """
         导出到Excel
@@ -1489,7 +1570,7 @@ class ExcelProcessor:
         
         try:
             # 创建Excel写入器，支持多个工作表
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            with pd.ExcelWriter(output_path, engine=_EXCEL_WRITER_ENGINE, engine_kwargs=_EXCEL_WRITER_KWARGS) as writer:
                 # 主数据表
                 df.to_excel(writer, sheet_name='合并数据', index=False)
                 
@@ -1508,7 +1589,7 @@ class ExcelProcessor:
                     len(self.selected_fields),
                     '是' if self.deduplicate else '否',
                     len(self.dedup_fields) if self.deduplicate else 0,
-                    self.duplicate_count - len(df) if self.deduplicate and self.duplicate_count > 0 else 0
+                    self.removed_count if self.deduplicate else 0
                 ]
                 
 
@@ -1520,18 +1601,18 @@ class ExcelProcessor:
                     '统计项目': stats_items,
                     '数值': stats_values
                 }
-                stats_df = pd.DataFrame(stats_data)
-                stats_df.to_excel(writer, sheet_name='处理统计', index=False)
+                self._write_small_sheet(writer, '处理统计', stats_data)
                 
-                # 字段信息表
+                # 字段信息表（一次计算所有字段的非空数量，空值数量由总行数推出）
+                selected_df = df[self.selected_fields]
+                notna_counts = selected_df.notna().sum()
                 field_info = {
                     '字段名称': self.selected_fields,
-                    '字段类型': [str(df[field].dtype) for field in self.selected_fields],
-                    '非空值数量': [df[field].notna().sum() for field in self.selected_fields],
-                    '空值数量': [df[field].isna().sum() for field in self.selected_fields]
+                    '字段类型': selected_df.dtypes.astype(str).tolist(),
+                    '非空值数量': notna_counts.tolist(),
+                    '空值数量': (len(df) - notna_counts).tolist()
                 }
-                field_df = pd.DataFrame(field_info)
-                field_df.to_excel(writer, sheet_name='字段信息', index=False)
+                self._write_small_sheet(writer, '字段信息', field_info)
                 
                 # 重复记录表（如果有重复记录）
                 sheet_names = ['合并数据', '处理统计', '字段信息']
@@ -1542,22 +1623,11 @@ class ExcelProcessor:
                     # 为重复记录添加分组信息
                     if self.dedup_fields:
                         try:
-                            duplicate_groups = duplicate_export.groupby(self.dedup_fields)
-                            group_ids = []
-                            group_sizes = []
-                            
-                            for group_id, (group_key, group_df) in enumerate(duplicate_groups, 1):
-                                for _ in range(len(group_df)):
-                                    group_ids.append(group_id)
-                                    group_sizes.append(len(group_df))
-                            
-                            # 确保长度匹配
-                            if len(group_ids) == len(duplicate_export):
-                                duplicate_export.insert(0, '重复组ID', group_ids)
-                                duplicate_export.insert(1, '组内重复数', group_sizes)
-                            else:
-                                print(f"⚠️  重复记录分组信息长度不匹配，跳过分组标记")
-                                print(f"   记录数: {len(duplicate_export)}, 分组标记数: {len(group_ids)}")
+                            # 每行的组编号与组大小直接按行对齐得到（组ID从1开始，顺序与按去重字段分组的顺序一致）
+                            group_codes = self._dedup_group_codes(duplicate_export, self.dedup_fields)
+                            group_sizes = np.bincount(group_codes)
+                            duplicate_export.insert(0, '重复组ID', group_codes + 1)
+                            duplicate_export.insert(1, '组内重复数', group_sizes[group_codes])
                         except Exception as e:
                             print(f"⚠️  处理重复记录分组信息时出错: {str(e)}")
                             print(f"   将导出原始重复记录，不包含分组信息")
@@ -1584,6 +1654,28 @@ class ExcelProcessor:
             print(f"❌ 导出文件时出错: {str(e)}")
             return None
     
+    def _write_small_sheet(self, writer: pd.ExcelWriter, sheet_name: str, data: Dict[str, list]):
+        """
+        写入行数很少的表格（统计信息、字段信息）
+        
+        使用 xlsxwriter 时直接逐行写入，省去 DataFrame 到单元格的转换；其他引擎仍使用 to_excel
+        
+        Args:
+            writer: Excel写入器
+            sheet_name: 工作表名称
+            data: 列名 -> 该列的值列表
+        """
+        if _EXCEL_WRITER_ENGINE != 'xlsxwriter':
+            pd.DataFrame(data).to_excel(writer, sheet_name=sheet_name, index=False)
+            return
+        
+        worksheet = writer.book.add_worksheet(sheet_name)
+        # 表头格式与 pandas to_excel 的默认表头一致（加粗、细边框、居中）
+        header_format = writer.book.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        worksheet.write_row(0, 0, list(data), header_format)
+        for row_index, row in enumerate(zip(*data.values()), start=1):
+            worksheet.write_row(row_index, 0, row)
+    
     def set_output_filename(self):
         """设置输出文件名"""
         print(f"\n=== 步骤4.5: 输出设置 ===")
@@ -1666,9 +1758,8 @@ class ExcelProcessor:
                 if deduplicate and dedup_fields:
                     print(f"🔍 去重字段: {', '.join(dedup_fields)}")
                     if self.duplicate_count > 0:
-                        removed_count = self.duplicate_count - len(result_df)
                         print(f"📊 发现重复记录: {self.duplicate_count} 条")
-                        print(f"🗑️  删除重复记录: {removed_count} 条")
+                        print(f"🗑️  删除重复记录: {self.removed_count} 条")
                         print(f"💾 重复记录已保存到 '重复记录' 工作表")
                     else:
                         print(f"✅ 未发现重复记录")
@@ -1806,35 +1897,6 @@ class ExcelProcessor:
         print(f"📄 最终记录: {dict(result_record)}")
         return pd.DataFrame([result_record])
     
-    def _create_separate_records(self, group_df: pd.DataFrame, conflicts: Dict, dedup_fields: List[str]) -> pd.DataFrame:
-        """为不同值创建单独记录"""
-        # 找到最多值的字段作为主字段
-        main_field = max(conflicts.keys(), key=lambda f: len(conflicts[f]))
-        main_values = conflicts[main_field]
-        
-        print(f"📝 以字段 '{main_field}' 为主字段创建 {len(main_values)} 条记录")
-        
-        result_records = []
-        base_record = group_df.iloc[0].copy()
-        
-        for i, main_value in enumerate(main_values):
-            new_record = base_record.copy()
-            new_record[main_field] = main_value
-            
-            # 为其他冲突字段选择对应的值
-            for field in conflicts:
-                if field != main_field:
-                    # 找到与main_value对应的记录中该字段的值
-                    matching_records = group_df[group_df[main_field] == main_value]
-                    if not matching_records.empty:
-                        new_record[field] = matching_records.iloc[0][field]
-                    # 如果没有完全匹配的记录，保持原值
-            
-            result_records.append(new_record)
-            print(f"  📄 记录 {i+1}: {main_field}={main_value}")
-        
-        return pd.DataFrame(result_records)
-    
     def _keep_most_frequent_values(self, group_df: pd.DataFrame, conflicts: Dict, dedup_fields: List[str]) -> pd.DataFrame:
         """保留出现次数最多的值"""
         result_record = group_df.iloc[0].copy()  # 基于第一条记录
@@ -2219,9 +2281,10 @@ class ExcelProcessor:
     def _manual_resolve_remaining_conflicts(self, base_record: pd.Series, conflict_info: dict) -> pd.Series:
         """手动解决剩余冲突字段"""
         result_record = base_record.copy()
+        original_values = {field: result_record[field] for field in conflict_info}
         
         print(f"\n🔧 开始处理其他冲突字段...")
-        print(f"📄 基础记录: {dict(result_record)}")
+        print(f"📄 基础记录: {result_record.to_dict()}")
         
         for field, values in conflict_info.items():
             print(f"\n📝 请选择字段 '{field}' 的值:")
@@ -2259,7 +2322,9 @@ class ExcelProcessor:
                     print("❌ 请输入有效的数字")
         
         print(f"\n✅ 所有冲突字段处理完成！")
-        print(f"📄 最终记录: {dict(result_record)}")
+        # 只汇总冲突字段的变化，其余字段与基础记录一致
+        changes = [f"{field}: {original_values[field]} → {result_record[field]}" for field in conflict_info]
+        print(f"📄 最终记录变更: {'; '.join(changes)}")
         return result_record
     
     def _create_records_by_name(self, group_df: pd.DataFrame, unique_names: dict, student_name_field: str) -> pd.DataFrame:
@@ -2275,6 +2340,41 @@ class ExcelProcessor:
         
         return pd.DataFrame(result_records)
 
+    def _reserve_backup_path(self, backup_dir: str, filename: str, existing_names: set) -> str:
+        """
+        在备份目录中为文件预留一个不重名的备份路径
+        
+        已知占用的名称直接在内存中跳过，候选名称以独占方式创建空文件占位，
+        如果该文件在读取目录之后才被创建，则继续尝试下一个序号
+        
+        Args:
+            backup_dir: 备份目录
+            filename: 原文件名
+            existing_names: 备份目录中已占用的文件名集合（会被更新）
+            
+        Returns:
+            已预留的备份文件路径
+        """
+        name, ext = os.path.splitext(filename)
+        backup_name = filename
+        counter = 1
+        
+        while True:
+            if backup_name not in existing_names:
+                existing_names.add(backup_name)
+                backup_path = os.path.join(backup_dir, backup_name)
+                try:
+                    fd = os.open(backup_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                except FileExistsError:
+                    pass
+                else:
+                    os.close(fd)
+                    return backup_path
+            
+            # 如果备份目录中已有同名文件，添加序号
+            backup_name = f"{name}_{counter}{ext}"
+            counter += 1
+    
     def backup_files(self, files: List[str]) -> bool:
         """
         备份选中的Excel文件
@@ -2293,14 +2393,14 @@ class ExcelProcessor:
             print("✅ 跳过备份，直接处理文件")
             return True
         
-        # 创建备份目录
-        import datetime
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = f"backup_{timestamp}"
+        # 创建备份目录（同一次运行中多次备份时复用同一个目录）
+        if self._backup_dir is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._backup_dir = f"backup_{timestamp}"
+        backup_dir = self._backup_dir
         
         try:
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
+            os.makedirs(backup_dir, exist_ok=True)
             
             print(f"📁 创建备份目录: {backup_dir}")
             
@@ -2308,28 +2408,36 @@ class ExcelProcessor:
             backup_success = 0
             backup_failed = 0
             
+            # 先确定每个文件的备份路径，避免并发复制时同名文件互相覆盖
+            # 备份目录中已有的文件名只读取一次，之后的冲突检查都在内存中完成
+            backup_tasks = []
+            existing_names = set(os.listdir(backup_dir))
             for file_path in files:
-                try:
-                    filename = os.path.basename(file_path)
-                    backup_path = os.path.join(backup_dir, filename)
-                    
-                    # 如果备份目录中已有同名文件，添加序号
-                    counter = 1
-                    original_backup_path = backup_path
-                    while os.path.exists(backup_path):
-                        name, ext = os.path.splitext(original_backup_path)
-                        backup_path = f"{name}_{counter}{ext}"
-                        counter += 1
-                    
-                    # 复制文件
-                    import shutil
-                    shutil.copy2(file_path, backup_path)
-                    print(f"✅ 已备份: {filename} -> {os.path.basename(backup_path)}")
-                    backup_success += 1
-                    
-                except Exception as e:
-                    print(f"❌ 备份失败: {os.path.basename(file_path)} - {str(e)}")
-                    backup_failed += 1
+                filename = os.path.basename(file_path)
+                backup_path = self._reserve_backup_path(backup_dir, filename, existing_names)
+                backup_tasks.append((file_path, backup_path, filename))
+            
+            # 复制文件（I/O密集，使用线程池并发复制）
+            with ThreadPoolExecutor(max_workers=io_worker_count(len(backup_tasks))) as executor:
+                futures = [
+                    executor.submit(shutil.copy2, file_path, backup_path)
+                    for file_path, backup_path, _ in backup_tasks
+                ]
+                # 按文件顺序输出结果，复制仍然并发进行，日志顺序与串行备份一致
+                for (_, backup_path, filename), future in zip(backup_tasks, futures):
+                    backup_name = os.path.basename(backup_path)
+                    try:
+                        future.result()
+                        print(f"✅ 已备份: {filename} -> {backup_name}")
+                        backup_success += 1
+                    except Exception as e:
+                        # 删除预留的空占位文件，避免被误认为是有效备份
+                        try:
+                            os.remove(backup_path)
+                        except FileNotFoundError:
+                            pass
+                        print(f"❌ 备份失败: {filename} - {str(e)}")
+                        backup_failed += 1
             
             print(f"\n📊 备份结果:")
             print(f"  ✅ 成功备份: {backup_success} 个文件")
@@ -2483,23 +2591,30 @@ class ExcelProcessor:
             print(f"  ⚠️  没有可用的列名可选择")
             return None
         
+        # 只有一个可选列名时无需等待输入（编号输入也只能选择它）
+        if len(available_columns) == 1:
+            print(f"  ✅ 自动选择唯一列: {available_columns[0]}")
+            return available_columns[0]
+        
         print(f"\n  📋 可用的列名:")
         for i, column in enumerate(available_columns, 1):
             print(f"    {i:2d}. {column}")
         
         print(f"\n  📝 请选择要映射到字段 '{required_field}' 的列名:")
         while True:
-            try:
-                choice = input("  请输入列名编号: ").strip()
-                choice_idx = int(choice) - 1
-                if 0 <= choice_idx < len(available_columns):
-                    selected_column = available_columns[choice_idx]
-                    print(f"  ✅ 选择了列名: {selected_column}")
-                    return selected_column
-                else:
-                    print("  ❌ 编号超出范围，请重新选择")
-            except ValueError:
+            choice = input("  请输入列名编号: ").strip()
+            match = _INT_RE.match(choice)
+            if not match:
                 print("  ❌ 请输入有效的数字")
+                continue
+            
+            choice_idx = int(match.group(1)) - 1
+            if 0 <= choice_idx < len(available_columns):
+                selected_column = available_columns[choice_idx]
+                print(f"  ✅ 选择了列名: {selected_column}")
+                return selected_column
+            else:
+                print("  ❌ 编号超出范围，请重新选择")
 
     def _normalize_for_compare(self, value) -> str:
         """
@@ -2536,7 +2651,7 @@ class ExcelProcessor:
             return cleaned_map[cleaned_target]
 
         # 4) 常见变体
-        if hasattr(self, 'common_column_variants') and target_field in self.common_column_variants:
+        if target_field in self.common_column_variants:
             for variant in self.common_column_variants[target_field]:
                 # 先精确
                 if variant in available:
@@ -2553,22 +2668,40 @@ class ExcelProcessor:
         best_col = None
         best_sim = 0.0
         for col in available:
-            sim = SequenceMatcher(None, cleaned_target.lower(), self.clean_column_name(col).lower()).ratio()
+            # 与 find_similar_columns_batch 使用同一打分方式，保证相似度阈值在各处含义一致
+            sim = self.calculate_similarity(cleaned_target, self.clean_column_name(col))
             if sim > best_sim:
                 best_sim = sim
                 best_col = col
-        if best_col and best_sim >= getattr(self, 'similarity_threshold', 0.8):
+        if best_col and best_sim >= self.similarity_threshold:
             return best_col
 
         return None
 
+    def _load_verify_source(self, file_path: str) -> Tuple[pd.DataFrame, Dict[str, pd.Series]]:
+        """
+        读取用于校验重复组的源文件（显示多个重复组时每个文件只读取一次）
+        
+        Args:
+            file_path: 源文件路径
+            
+        Returns:
+            (源文件数据框, 该文件已归一化的列缓存)
+        """
+        cached = self._verify_source_cache.get(file_path)
+        if cached is None:
+            # 读取失败时直接抛出异常，不写入缓存
+            cached = (pd.read_excel(file_path, engine=_EXCEL_ENGINE), {})
+            self._verify_source_cache[file_path] = cached
+        return cached
+    
     def _verify_group_key_in_file(self, file_path: str, dedup_fields: List[str], group_key) -> bool:
         """
         校验：在指定的源文件中，是否存在与当前重复组键一致的记录。
         静默匹配列名，避免打印和交互，且进行值归一化比较。
         """
         try:
-            df_src = pd.read_excel(file_path)
+            df_src, normalized_columns = self._load_verify_source(file_path)
         except Exception:
             return False
 
@@ -2591,14 +2724,48 @@ class ExcelProcessor:
         # 构建掩码进行比较（统一归一化）
         mask = pd.Series([True] * len(df_src))
         for actual_col, key_value in zip(actual_cols, key_values):
-            series_obj = df_src[actual_col]
-            # 归一化列
-            series_norm = series_obj.apply(self._normalize_for_compare)
+            # 归一化列（同一文件的同一列只归一化一次）
+            series_norm = normalized_columns.get(actual_col)
+            if series_norm is None:
+                series_norm = df_src[actual_col].apply(self._normalize_for_compare)
+                normalized_columns[actual_col] = series_norm
             cmp_val = self._normalize_for_compare(key_value)
             mask = mask & (series_norm == cmp_val)
 
         return bool(mask.any())
 
+    def _conflict_group_flags(self, df: pd.DataFrame, codes: np.ndarray, dedup_fields: List[str], student_name_field: str) -> pd.Series:
+        """
+        批量判断每个重复组是否存在冲突，判断规则与 _group_has_student_name_conflict 相同：
+        姓名字段或任一非去重字段在组内有超过1个不同的非空值（去首尾空格后比较）
+        
+        Args:
+            df: 重复记录数据框
+            codes: 与 df 行一一对应的组编号
+            dedup_fields: 去重字段列表
+            student_name_field: 学生姓名字段名
+            
+        Returns:
+            以组编号为索引、按编号升序排列的布尔序列
+        """
+        exclude_fields = set(['数据来源文件', '数据来源路径'] + dedup_fields)
+        check_fields = [field for field in df.columns if field not in exclude_fields]
+        if student_name_field and student_name_field in df.columns and student_name_field in exclude_fields:
+            check_fields.append(student_name_field)
+        
+        group_sizes = pd.Series(codes).value_counts().sort_index()
+        has_conflict = pd.Series(False, index=group_sizes.index)
+        for field in check_fields:
+            column = df[field]
+            normalized = column.astype(str).str.strip()
+            # 空值和空字符串不参与比较
+            normalized = normalized.where(column.notna().to_numpy() & (normalized != '').to_numpy())
+            distinct_counts = normalized.groupby(codes).nunique()
+            has_conflict |= distinct_counts.reindex(has_conflict.index, fill_value=0) > 1
+        
+        # 只有1条记录的组不存在冲突
+        return has_conflict & (group_sizes > 1)
+    
     def _group_has_student_name_conflict(self, group_df: pd.DataFrame, dedup_fields: List[str], student_name_field: str) -> bool:
         """
         检查重复组是否存在冲突（学号相同但姓名不同，或其他字段不同）
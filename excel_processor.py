@@ -1,8 +1,29 @@
 import pandas as pd
+import numpy as np
 import os
 import glob
 import re
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Callable, Iterator
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+
+from excel_utils import io_worker_count, calculate_similarity
+
+try:
+    from rapidfuzz.distance import Hamming
+except ImportError:  # 未安装 rapidfuzz 时逐字符比较
+    Hamming = None
+
+try:
+    import python_calamine  # noqa: F401  Rust 实现的 Excel 读取引擎，比 openpyxl 快数倍
+    _EXCEL_ENGINE = 'calamine'
+except ImportError:  # 未安装时使用 pandas 默认引擎
+    _EXCEL_ENGINE = None
+
+# 支持的学号 / 学生姓名字段名称（按优先顺序）
+_STUDENT_ID_FIELDS = ('学号', '*学号')
+_STUDENT_NAME_FIELDS = ('学生姓名', '*学生姓名')
 
 class ExcelProcessor:
     """Excel文件处理工具"""
@@ -14,6 +35,7 @@ class ExcelProcessor:
         self.deduplicate = False
         self.dedup_fields = []
         self.output_filename = "result.xlsx"
+        self._df_cache = {}  # 文件路径 -> (修改时间, 文件大小, 数据框)，文件未改动时只解析一次；每个流程结束后清空
         
         # 学生姓名补充功能相关属性（旧版本，保留兼容性）
         self.enable_name_supplement = False
@@ -71,8 +93,72 @@ class ExcelProcessor:
         Returns:
             相似度 (0-1)
         """
-        from difflib import SequenceMatcher
-        return SequenceMatcher(None, str1.lower(), str2.lower()).ratio()
+        return calculate_similarity(str1, str2)
+    
+    def _read_excel(self, file_path: str) -> pd.DataFrame:
+        """
+        读取Excel文件（按文件缓存解析结果，文件修改时间或大小变化后重新读取）
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            数据框副本，调用方修改它不会影响缓存
+        """
+        stat = os.stat(file_path)
+        cached = self._df_cache.get(file_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2].copy()
+        
+        df = pd.read_excel(file_path, engine=_EXCEL_ENGINE)
+        self._df_cache[file_path] = (stat.st_mtime_ns, stat.st_size, df)
+        return df.copy()
+    
+    def _read_headers(self, file_path: str) -> List[str]:
+        """
+        只读取Excel文件的表头行，不解析数据行
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            列名列表
+        """
+        return list(pd.read_excel(file_path, nrows=0, engine=_EXCEL_ENGINE).columns)
+    
+    def _read_files_concurrently(self, files: List[str], reader: Callable) -> Iterator:
+        """
+        使用线程池并发读取多个文件，按传入顺序逐个产出结果
+        
+        同时进行中的读取数量不超过线程数，调用方处理完一个结果后才会提交下一个读取，
+        避免一次性把所有文件都解析到内存中
+        
+        Args:
+            files: 文件列表
+            reader: 读取单个文件的函数，如 self._read_headers / self._read_excel
+            
+        Returns:
+            与 files 一一对应的读取结果迭代器，读取失败的文件对应其异常对象
+        """
+        def read_safely(file_path):
+            try:
+                return reader(file_path)
+            except Exception as e:
+                return e
+        
+        if len(files) < 2:
+            for file_path in files:
+                yield read_safely(file_path)
+            return
+        
+        max_workers = io_worker_count(len(files))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque(executor.submit(read_safely, file_path) for file_path in files[:max_workers])
+            for file_path in files[max_workers:]:
+                yield pending.popleft().result()
+                pending.append(executor.submit(read_safely, file_path))
+            while pending:
+                yield pending.popleft().result()
     
     def select_files(self, folder_path: str = ".") -> List[str]:
         """
@@ -153,10 +239,10 @@ class ExcelProcessor:
         all_fields = set()
         file_field_info = {}
         
-        for file in files:
+        for file, file_fields in zip(files, self._read_files_concurrently(files, self._read_headers)):
             try:
-                df = pd.read_excel(file)
-                file_fields = list(df.columns)
+                if isinstance(file_fields, Exception):
+                    raise file_fields
                 all_fields.update(file_fields)
                 file_field_info[os.path.basename(file)] = {
                     'field_count': len(file_fields),
@@ -200,16 +286,18 @@ class ExcelProcessor:
         
         print(f"\n🔍 分析学生姓名补充情况...")
         
-        for file in files:
+        # 只需要判断字段是否存在，读取表头即可
+        for file, headers in zip(files, self._read_files_concurrently(files, self._read_headers)):
             try:
-                df = pd.read_excel(file)
-                file_fields = list(df.columns)
+                if isinstance(headers, Exception):
+                    raise headers
+                file_fields = set(headers)
                 filename = os.path.basename(file)
                 
                 # 支持多种学号字段名称
-                has_student_id = any(id_field in file_fields for id_field in ['学号', '*学号'])
+                has_student_id = not file_fields.isdisjoint(_STUDENT_ID_FIELDS)
                 # 支持多种学生姓名字段名称
-                has_student_name = any(name in file_fields for name in ['学生姓名', '*学生姓名'])
+                has_student_name = not file_fields.isdisjoint(_STUDENT_NAME_FIELDS)
                 
                 if has_student_id and has_student_name:
                     analysis_result['files_with_both'].append(file)
@@ -244,28 +332,25 @@ class ExcelProcessor:
         mapping = {}
         total_mappings = 0
         
-        for file in files_with_both:
+        # 数据只用于构建映射，直接读取而不放入 _df_cache，处理完一个文件即可释放
+        def read_uncached(file_path):
+            return pd.read_excel(file_path, engine=_EXCEL_ENGINE)
+        
+        for file, df in zip(files_with_both, self._read_files_concurrently(files_with_both, read_uncached)):
             try:
-                df = pd.read_excel(file)
+                if isinstance(df, Exception):
+                    raise df
                 filename = os.path.basename(file)
                 
                 # 确定学号字段名称
-                student_id_field = None
-                for id_field in ['学号', '*学号']:
-                    if id_field in df.columns:
-                        student_id_field = id_field
-                        break
+                student_id_field = self._find_first_column(df, _STUDENT_ID_FIELDS)
                 
                 if not student_id_field:
                     print(f"⚠️  文件 '{filename}' 缺少学号字段，跳过")
                     continue
                 
                 # 确定学生姓名字段名称
-                student_name_field = None
-                for name_field in ['学生姓名', '*学生姓名']:
-                    if name_field in df.columns:
-                        student_name_field = name_field
-                        break
+                student_name_field = self._find_first_column(df, _STUDENT_NAME_FIELDS)
                 
                 if not student_name_field:
                     print(f"⚠️  文件 '{filename}' 缺少学生姓名字段，跳过")
@@ -273,14 +358,15 @@ class ExcelProcessor:
                 
                 # 构建映射关系
                 file_mappings = 0
-                for _, row in df.iterrows():
-                    student_id = str(row[student_id_field]).strip()
-                    student_name = str(row[student_name_field]).strip()
-                    
-                    # 跳过空值
-                    if pd.isna(student_id) or pd.isna(student_name) or student_id == '' or student_name == '':
-                        continue
-                    
+                # 整列归一化学号和姓名，跳过任一为空值或空字符串的记录
+                student_ids = df[student_id_field].astype(str).str.strip()
+                student_names = df[student_name_field].astype(str).str.strip()
+                valid = (
+                    df[student_id_field].notna() & df[student_name_field].notna()
+                    & (student_ids != '') & (student_names != '')
+                ).to_numpy()
+                
+                for student_id, student_name in zip(student_ids.to_numpy()[valid], student_names.to_numpy()[valid]):
                     # 如果学号已存在，优先使用第一个匹配的姓名
                     if student_id not in mapping:
                         mapping[student_id] = student_name
@@ -343,6 +429,20 @@ class ExcelProcessor:
         print(f"✅ 已设置默认学生姓名: {default_name}")
         return True, default_name
     
+    def _find_first_column(self, df: pd.DataFrame, candidates: Tuple[str, ...]) -> Optional[str]:
+        """
+        按优先顺序返回数据框中第一个存在的候选字段名
+        
+        Args:
+            df: 数据框
+            candidates: 候选字段名（按优先顺序）
+            
+        Returns:
+            存在的字段名，都不存在时返回None
+        """
+        columns = df.columns
+        return next((field for field in candidates if field in columns), None)
+    
     def supplement_student_names(self, df: pd.DataFrame, mapping: Dict[str, str], 
                                default_name: str) -> pd.DataFrame:
         """
@@ -357,22 +457,14 @@ class ExcelProcessor:
             补充后的数据框
         """
         # 确定学号字段名称
-        student_id_field = None
-        for id_field in ['学号', '*学号']:
-            if id_field in df.columns:
-                student_id_field = id_field
-                break
+        student_id_field = self._find_first_column(df, _STUDENT_ID_FIELDS)
         
         if not student_id_field:
             print(f"⚠️  数据框不包含学号字段，无法补充学生姓名")
             return df
         
         # 确定学生姓名字段名称
-        student_name_field = None
-        for name_field in ['学生姓名', '*学生姓名']:
-            if name_field in df.columns:
-                student_name_field = name_field
-                break
+        student_name_field = self._find_first_column(df, _STUDENT_NAME_FIELDS)
         
         # 如果已经有学生姓名字段，先检查是否需要补充
         if student_name_field:
@@ -400,39 +492,53 @@ class ExcelProcessor:
         if before_filter > after_filter:
             print(f"⚠️  过滤掉 {before_filter - after_filter} 条学号为空的记录")
         
-        for idx, row in df.iterrows():
-            student_id = str(row[student_id_field]).strip()
-            
-            # 跳过空学号（双重检查）
-            if pd.isna(student_id) or student_id == '':
-                continue
-            
-            # 检查当前学生姓名是否为空
-            current_name = str(row[student_name_field]).strip()
-            if pd.isna(current_name) or current_name == '' or current_name == default_name:
-                # 尝试从映射中获取学生姓名（精确匹配）
-                if student_id in mapping:
-                    df.at[idx, student_name_field] = mapping[student_id]
+        # 按学号长度对映射分桶（桶内保持映射中的原有顺序），模糊匹配时只需比较长度相同的学号
+        mapping_by_length = {}
+        for map_id, map_name in mapping.items():
+            mapping_by_length.setdefault(len(map_id), []).append((map_id, map_name))
+        
+        # 整列归一化学号和当前姓名，只对学号非空且姓名为空（空值、空字符串或默认姓名）的记录逐条查找映射
+        student_ids = df[student_id_field].astype(str).str.strip()
+        current_names = df[student_name_field].astype(str).str.strip()
+        needs_name = (student_ids != '') & (
+            df[student_name_field].isna() | (current_names == '') | (current_names == default_name)
+        )
+        need_positions = np.flatnonzero(needs_name.to_numpy())
+        
+        new_names = []
+        for student_id in student_ids.to_numpy()[need_positions]:
+            # 尝试从映射中获取学生姓名（精确匹配）
+            if student_id in mapping:
+                new_names.append(mapping[student_id])
+                successful_matches += 1
+            else:
+                # 尝试正则匹配（支持一位字符的模糊匹配）
+                matched_name = None
+                # 只有学号长度相同时才尝试一位字符的模糊匹配
+                for map_id, map_name in mapping_by_length.get(len(student_id), ()):
+                    # 计算不同字符的数量（超过1个时 rapidfuzz 会提前结束比较）
+                    if Hamming is not None:
+                        diff_count = Hamming.distance(student_id, map_id, score_cutoff=1)
+                    else:
+                        diff_count = sum(1 for a, b in zip(student_id, map_id) if a != b)
+                    if diff_count <= 1:  # 允许一位字符的差异
+                        matched_name = map_name
+                        break
+                
+                if matched_name:
+                    new_names.append(matched_name)
                     successful_matches += 1
                 else:
-                    # 尝试正则匹配（支持一位字符的模糊匹配）
-                    matched_name = None
-                    for map_id, map_name in mapping.items():
-                        # 如果学号长度相同，尝试一位字符的模糊匹配
-                        if len(student_id) == len(map_id):
-                            # 计算不同字符的数量
-                            diff_count = sum(1 for a, b in zip(student_id, map_id) if a != b)
-                            if diff_count <= 1:  # 允许一位字符的差异
-                                matched_name = map_name
-                                break
-                    
-                    if matched_name:
-                        df.at[idx, student_name_field] = matched_name
-                        successful_matches += 1
-                    else:
-                        df.at[idx, student_name_field] = default_name
-                        default_used += 1
-                    supplemented_count += 1
+                    new_names.append(default_name)
+                    default_used += 1
+                supplemented_count += 1
+        
+        if len(need_positions) > 0:
+            # 整列为空的姓名列会被读成数值类型，需要先转为 object 才能写入姓名
+            name_dtype = df[student_name_field].dtype
+            if not (pd.api.types.is_object_dtype(name_dtype) or pd.api.types.is_string_dtype(name_dtype)):
+                df[student_name_field] = df[student_name_field].astype(object)
+            df.iloc[need_positions, df.columns.get_loc(student_name_field)] = new_names
         
         # 更新统计信息
         self.supplement_stats['total_supplemented'] += supplemented_count
@@ -455,8 +561,7 @@ class ExcelProcessor:
             字段列表
         """
         try:
-            df = pd.read_excel(file_path)
-            return list(df.columns)
+            return self._read_headers(file_path)
         except Exception as e:
             return []
     
@@ -627,7 +732,7 @@ class ExcelProcessor:
         for i, file in enumerate(files, 1):
             try:
                 print(f"\n📄 处理文件 {i}/{len(files)}: {os.path.basename(file)}")
-                df = pd.read_excel(file)
+                df = self._read_excel(file)
                 
                 # 检查文件是否包含所有选中字段，支持学号和学生姓名字段的变体
                 missing_fields = []
@@ -859,12 +964,16 @@ class ExcelProcessor:
         # 选择操作模式
         mode = self.select_operation_mode()
         
-        if mode == "merge":
-            self.run_merge_mode()
-        elif mode == "multi_sync":
-            self.run_multi_sync_mode()
-        else:
-            print("👋 程序退出")
+        try:
+            if mode == "merge":
+                self.run_merge_mode()
+            elif mode == "multi_sync":
+                self.run_multi_sync_mode()
+            else:
+                print("👋 程序退出")
+        finally:
+            # 流程结束后释放缓存的数据框
+            self._df_cache.clear()
     
     def run_sync_only(self):
         """运行同步功能（专门用于excel_tool.py调用）"""
@@ -875,7 +984,11 @@ class ExcelProcessor:
         print("=" * 60)
         
         # 直接使用多源同步模式（支持单个或多个源文件）
-        self.run_multi_sync_mode()
+        try:
+            self.run_multi_sync_mode()
+        finally:
+            # 流程结束后释放缓存的数据框
+            self._df_cache.clear()
     
     def select_operation_mode(self) -> str:
         """
@@ -1062,8 +1175,8 @@ class ExcelProcessor:
         
         try:
             # 读取源文件和目标文件
-            source_df = pd.read_excel(self.source_file)
-            target_df = pd.read_excel(self.target_file)
+            source_df = self._read_excel(self.source_file)
+            target_df = self._read_excel(self.target_file)
             
             # 获取两个文件的列名
             source_columns = list(source_df.columns)
@@ -1264,8 +1377,8 @@ class ExcelProcessor:
         
         try:
             # 读取源文件和目标文件
-            source_df = pd.read_excel(self.source_file)
-            target_df = pd.read_excel(self.target_file)
+            source_df = self._read_excel(self.source_file)
+            target_df = self._read_excel(self.target_file)
             
             # 获取两个文件的列名
             source_columns = list(source_df.columns)
@@ -1319,8 +1432,8 @@ class ExcelProcessor:
         
         try:
             # 读取源文件和目标文件
-            source_df = pd.read_excel(self.source_file)
-            target_df = pd.read_excel(self.target_file)
+            source_df = self._read_excel(self.source_file)
+            target_df = self._read_excel(self.target_file)
             
             # 统计记录数
             self.sync_stats['source_records'] = len(source_df)
@@ -1386,12 +1499,17 @@ class ExcelProcessor:
                 return col
         
         # 5. 相似度匹配（简单版本）
-        from difflib import SequenceMatcher
+        target_lower = str(target_field).lower()
+        lowered_columns = [str(col).lower() for col in columns]
         best_match = None
         best_ratio = 0.8  # 相似度阈值
         
-        for col in columns:
-            ratio = SequenceMatcher(None, str(target_field).lower(), str(col).lower()).ratio()
+        for col, lowered_col in zip(columns, lowered_columns):
+            matcher = SequenceMatcher(None, target_lower, lowered_col)
+            # real_quick_ratio / quick_ratio 是 ratio 的上限，达不到当前最佳值时无需完整计算
+            if matcher.real_quick_ratio() <= best_ratio or matcher.quick_ratio() <= best_ratio:
+                continue
+            ratio = matcher.ratio()
             if ratio > best_ratio:
                 best_ratio = ratio
                 best_match = col
@@ -1922,7 +2040,7 @@ class ExcelProcessor:
         
         try:
             # 读取目标文件
-            target_df = pd.read_excel(self.target_file)
+            target_df = self._read_excel(self.target_file)
             target_columns = list(target_df.columns)
             
             if not target_columns:
@@ -1976,7 +2094,7 @@ class ExcelProcessor:
                 print(f"\n📄 处理源文件: {source_filename}")
                 
                 try:
-                    source_df = pd.read_excel(source_file)
+                    source_df = self._read_excel(source_file)
                     source_columns = list(source_df.columns)
                     
                     if not source_columns:
@@ -2101,7 +2219,7 @@ class ExcelProcessor:
         
         try:
             # 读取目标文件
-            target_df = pd.read_excel(self.target_file)
+            target_df = self._read_excel(self.target_file)
             target_columns = list(target_df.columns)
             
             # 排除关联字段，显示目标文件的可更新字段
@@ -2171,7 +2289,7 @@ class ExcelProcessor:
                         continue
                     
                     try:
-                        source_df = pd.read_excel(source_file)
+                        source_df = self._read_excel(source_file)
                         source_columns = list(source_df.columns)
                         
                         # 尝试模糊匹配目标更新字段
@@ -2406,13 +2524,13 @@ class ExcelProcessor:
         
         try:
             # 读取目标文件
-            target_df = pd.read_excel(self.target_file)
+            target_df = self._read_excel(self.target_file)
             print(f"📊 目标文件包含 {len(target_df)} 条记录")
             
             # 读取所有源文件
             source_data = {}
             for source_file in self.source_files:
-                source_df = pd.read_excel(source_file)
+                source_df = self._read_excel(source_file)
                 source_data[os.path.basename(source_file)] = source_df
                 print(f"📊 源文件 '{os.path.basename(source_file)}' 包含 {len(source_df)} 条记录")
             
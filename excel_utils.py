@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel工具集公共函数
+供 excel_merger.py 和 excel_processor.py 共同使用，避免两处实现不一致
+"""
+
+import os
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+def io_worker_count(task_count: int) -> int:
+    """
+    计算I/O密集型任务（读取、复制文件）使用的线程数
+    
+    Args:
+        task_count: 任务数量
+        
+    Returns:
+        线程数（至少为1，最多为8）
+    """
+    return min(8, (os.cpu_count() or 1) * 2, task_count) or 1
+
+
+@lru_cache(maxsize=4096)
+def calculate_similarity(str1: str, str2: str) -> float:
+    """
+    计算两个字符串的相似度（忽略大小写，按字符串对缓存结果，相同的字段名只比较一次）
+    
+    Args:
+        str1: 字符串1
+        str2: 字符串2
+        
+    Returns:
+        相似度 (0-1)
+    """
+    str1 = str1.lower()
+    str2 = str2.lower()
+    # 完全相同（包括都为空）或只有一方为空时无需逐字符比较
+    if str1 == str2:
+        return 1.0
+    if not str1 or not str2:
+        return 0.0
+    
+    # 使用SequenceMatcher计算相似度
+    return SequenceMatcher(None, str1, str2).ratio()